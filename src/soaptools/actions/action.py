@@ -1,4 +1,30 @@
+import ast
+import importlib.util
+import json
+import os
+import py_compile
 from argparse import Namespace, ArgumentParser
+from concurrent.futures import Executor
+from contextlib import contextmanager
+from typing import Optional, Dict, Callable, Any, Iterator
+
+import soaptools
+
+from soaptools.actions.manifest import Manifest, get_code_digest
+from soaptools.code_generators.python.definitions.package import LAYOUTS, MODULE_LAYOUT
+from soaptools.exceptions import ApplicationException
+from soaptools.helpers.cache import DocumentCache, DEFAULT_CACHE_DIRECTORY, DEFAULT_TTL, DEFAULT_MAX_SIZE
+from soaptools.helpers.profiler import Profiler
+from soaptools.helpers.py import format_modules, format_code, get_file_digest, Logger
+from soaptools.soap.cache import DeclarationCache
+from soaptools.soap.loader import DocumentLoader, DEFAULT_MAX_WORKERS
+
+# --compile value -> how python checks that .pyc is still valid for its source
+PYC_INVALIDATION_MODES = {
+    "timestamp": py_compile.PycInvalidationMode.TIMESTAMP,
+    "checked-hash": py_compile.PycInvalidationMode.CHECKED_HASH,
+    "unchecked-hash": py_compile.PycInvalidationMode.UNCHECKED_HASH,
+}
 
 
 class Action:
@@ -6,9 +32,283 @@ class Action:
     help: str
 
     @classmethod
-    def execute(cls, arguments: Namespace):
+    def execute(
+        cls,
+        arguments: Namespace,
+        loader: DocumentLoader = None,
+        declaration_cache: DeclarationCache = None,
+        format_executor: Executor = None
+    ):
+        """
+        :param loader: loader shared with other actions run in the same process, together with declaration_cache.
+            When not passed, both are created from arguments
+        :param format_executor: process pool shared with other actions, used for formatting
+        """
         pass
 
     @classmethod
     def add_arguments_to_action_parser(cls, action_parser: ArgumentParser):
         raise NotImplementedError()
+
+    @classmethod
+    def add_document_loader_arguments(cls, action_parser: ArgumentParser):
+        action_parser.add_argument(
+            "--max-workers",
+            type=int,
+            default=DEFAULT_MAX_WORKERS,
+            help=f"maximal number of schemas downloaded concurrently (default: {DEFAULT_MAX_WORKERS})"
+        )
+        action_parser.add_argument(
+            "--cache-dir",
+            type=str,
+            default=DEFAULT_CACHE_DIRECTORY,
+            help=f"directory of remote documents and parsed declarations cache (default: {DEFAULT_CACHE_DIRECTORY})"
+        )
+        action_parser.add_argument(
+            "--no-cache",
+            help="don't cache remote documents nor parsed declarations",
+            action="store_true"
+        )
+        action_parser.add_argument(
+            "--cache-ttl",
+            type=float,
+            default=DEFAULT_TTL,
+            help="seconds during which cached document is used without revalidation (default: always revalidate)"
+        )
+        action_parser.add_argument(
+            "--cache-max-size",
+            type=int,
+            default=DEFAULT_MAX_SIZE // (1024 * 1024),
+            help=f"cache size in MB, least recently used documents are evicted above it "
+                 f"(default: {DEFAULT_MAX_SIZE // (1024 * 1024)})"
+        )
+        action_parser.add_argument(
+            "--offline",
+            help="use only cached remote documents, never touch network",
+            action="store_true"
+        )
+        action_parser.add_argument(
+            "--huge-tree",
+            help="lift XML parser limits (tree depth, text size), required by some very large schemas",
+            action="store_true"
+        )
+
+    @classmethod
+    def add_output_arguments(cls, action_parser: ArgumentParser):
+        action_parser.add_argument(
+            "--no-format",
+            help="don't format generated code with black, faster when output is never read",
+            action="store_true"
+        )
+        action_parser.add_argument(
+            "--layout",
+            choices=LAYOUTS,
+            default=MODULE_LAYOUT,
+            help="generate types as single module, or as package with module per namespace, "
+                 "imported only when one of its types is used (default: module)"
+        )
+        action_parser.add_argument(
+            "--chunk-size",
+            type=int,
+            help="with package layout, split namespaces into modules of at most that many classes"
+        )
+        action_parser.add_argument(
+            "--compile",
+            nargs="?",
+            const="timestamp",
+            choices=list(PYC_INVALIDATION_MODES),
+            help="write .pyc of generated modules into __pycache__, so they're never compiled on import. "
+                 "With unchecked-hash python doesn't even check if .pyc matches source, for read-only images "
+                 "(default: timestamp)"
+        )
+        action_parser.add_argument(
+            "--profile",
+            metavar="PATH",
+            help="write JSON report of wall time, CPU time and peak memory of every phase (fetch, parse, generate, "
+                 "format, write, compile) and of counts of documents, declarations and classes to PATH"
+        )
+        action_parser.add_argument(
+            "--force",
+            help="regenerate even if manifest says output is up to date with inputs",
+            action="store_true"
+        )
+
+    @classmethod
+    def get_output_options(cls, arguments: Namespace) -> Dict[str, Any]:
+        """
+        Output arguments affecting generated code, recorded in manifest
+        """
+        return {
+            "no_format": arguments.no_format,
+            "layout": arguments.layout,
+            "chunk_size": arguments.chunk_size,
+            "compile": arguments.compile,
+        }
+
+    @classmethod
+    @contextmanager
+    def profile(cls, arguments: Namespace, run: Dict[str, Any]) -> Iterator[Profiler]:
+        """
+        Profiler of run, disabled without --profile. Report is written when run ends, even if it failed
+
+        :param run: description of run, written into report
+        """
+        profiler = Profiler(enabled=bool(arguments.profile))
+        profiler.start()
+        try:
+            yield profiler
+        finally:
+            if arguments.profile:
+                report = {"version": soaptools.__version__, **run, **profiler.stop()}
+                with open(arguments.profile, mode="w") as file:
+                    json.dump(report, file, indent=2)
+                Logger.info(f"Profile written to {arguments.profile}")
+
+    @classmethod
+    def get_previous_manifest(cls, arguments: Namespace, manifest_path: str) -> Optional[Manifest]:
+        return None if arguments.force else Manifest.load(manifest_path)
+
+    @classmethod
+    def format_modules(cls, arguments: Namespace, modules: Dict[str, str], executor: Executor = None) -> Dict[str, str]:
+        """
+        :param modules: module name -> generated code
+        """
+        if arguments.no_format:
+            return modules
+        return format_modules(modules, executor=executor)
+
+    @classmethod
+    def write_modules(
+        cls,
+        arguments: Namespace,
+        directory: str,
+        modules: Dict[str, ast.Module],
+        manifest: Manifest = None,
+        format_executor: Executor = None,
+        profiler: Profiler = None
+    ) -> Dict[str, Dict[str, Optional[str]]]:
+        """
+        Writes formatted modules into directory, creating it and subpackages when needed.
+        Modules with the same code as recorded in manifest of previous run with the same output options
+        are neither formatted nor written again.
+        With --compile, .pyc of every written module is written too, without it stale .pyc of written module is removed.
+
+        :param modules: module name -> module, modules of subpackages named "<package>/<module>"
+        :return: written files, as recorded in manifest
+        """
+        profiler = profiler or Profiler(enabled=False)
+        output_options = cls.get_output_options(arguments)
+        if manifest is not None and any(manifest.options.get(key) != value for key, value in output_options.items()):
+            # recorded files were formatted or compiled differently, all of them are written again
+            manifest = None
+        files = {}
+        modules_code = {}
+        for module_name, module in modules.items():
+            profiler.count("modules")
+            profiler.count("classes", sum(isinstance(node, ast.ClassDef) for node in module.body))
+            with profiler.phase("generate"):
+                code = ast.unparse(module)
+            path = module_name + ".py"
+            if manifest is not None and (record := manifest.get_unchanged_file(directory, path, get_code_digest(code))):
+                files[path] = record
+                if arguments.compile and not os.path.exists(importlib.util.cache_from_source(os.path.join(directory, path))):
+                    with profiler.phase("compile"):
+                        cls.compile_module(arguments, os.path.join(directory, path))
+            else:
+                modules_code[module_name] = code
+
+        with profiler.phase("format"):
+            formatted_modules_code = cls.format_modules(arguments, modules_code, format_executor)
+        for module_name, code in formatted_modules_code.items():
+            path = os.path.join(directory, *module_name.split("/")) + ".py"
+            with profiler.phase("write"):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, mode="w") as file:
+                    file.write(code)
+            profiler.count("written_modules")
+            if arguments.compile:
+                with profiler.phase("compile"):
+                    cls.compile_module(arguments, path)
+            else:
+                cls.remove_compiled_module(path)
+            files[module_name + ".py"] = {"source": get_code_digest(modules_code[module_name]), "output": get_file_digest(path)}
+        return files
+
+    @classmethod
+    def compile_module(cls, arguments: Namespace, path: str):
+        """
+        Writes .pyc of module where import looks for it, __pycache__ next to module
+        """
+        try:
+            py_compile.compile(path, doraise=True, invalidation_mode=PYC_INVALIDATION_MODES[arguments.compile])
+        except py_compile.PyCompileError as error:
+            Logger.warning(f"Compiling {path} failed, it will be compiled on import: {error.msg}")
+
+    @classmethod
+    def remove_compiled_module(cls, path: str):
+        """
+        Removes .pyc of module written by previous run with --compile, unchecked-hash one would still be imported
+        instead of new source
+        """
+        try:
+            os.remove(importlib.util.cache_from_source(path))
+        except FileNotFoundError:
+            pass
+
+    @classmethod
+    def read_modules(cls, directory: str) -> Dict[str, ast.Module]:
+        """
+        Parses modules written before into directory, if there are any
+
+        :return: module name -> module
+        """
+        if not os.path.isdir(directory):
+            return {}
+        modules = {}
+        for file_name in sorted(os.listdir(directory)):
+            if file_name.endswith(".py"):
+                with open(os.path.join(directory, file_name)) as file:
+                    modules[file_name[:-len(".py")]] = ast.parse(file.read())
+        return modules
+
+    @classmethod
+    def get_code_formatter(cls, arguments: Namespace, profiler: Profiler = None) -> Optional[Callable[[str], str]]:
+        """
+        Formatter of code generated class by class. Classes are formatted in calling thread, not in process pool
+        shared by batch jobs, as round trip to pool per class costs more than formatting it
+        """
+        if arguments.no_format:
+            return None
+        if profiler is None or not profiler.enabled:
+            return format_code
+
+        def profiled_formatter(code: str) -> str:
+            with profiler.phase("format"):
+                return format_code(code)
+        return profiled_formatter
+
+    @classmethod
+    def get_document_loader(cls, arguments: Namespace, profiler: Profiler = None) -> DocumentLoader:
+        cache = None
+        if arguments.no_cache:
+            if arguments.offline:
+                raise ApplicationException("--offline can't be used together with --no-cache")
+        else:
+            cache = DocumentCache(
+                directory=arguments.cache_dir,
+                ttl=arguments.cache_ttl,
+                max_size=arguments.cache_max_size * 1024 * 1024,
+                offline=arguments.offline,
+            )
+        return DocumentLoader(
+            max_workers=arguments.max_workers,
+            cache=cache,
+            huge_tree=arguments.huge_tree,
+            profiler=profiler
+        )
+
+    @classmethod
+    def get_declaration_cache(cls, arguments: Namespace) -> Optional[DeclarationCache]:
+        if arguments.no_cache:
+            return None
+        return DeclarationCache(os.path.join(arguments.cache_dir, "declarations"))
@@ -0,0 +1,133 @@
+import json
+import multiprocessing
+import os
+import shlex
+from contextlib import nullcontext
+from argparse import Namespace, ArgumentParser
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from typing import List, Tuple, Type
+
+from soaptools.actions.action import Action
+from soaptools.actions.generate_bindings import GenerateBindingsAction
+from soaptools.actions.generate_client import GenerateClientAction
+from soaptools.exceptions import ApplicationException
+from soaptools.helpers.py import Logger
+from soaptools.soap.cache import DeclarationCache
+from soaptools.soap.loader import DocumentLoader
+
+BATCH_ACTIONS: List[Type[Action]] = [
+    GenerateBindingsAction,
+    GenerateClientAction
+]
+
+DEFAULT_JOBS = 4
+
+
+class GenerateBatchAction(Action):
+    """
+    Runs generate-client and generate-bindings for every job of config file, in one process:
+
+    {
+        "jobs": [
+            {"action": "generate-client", "arguments": ["https://example.com/orders?wsdl", "clients/orders", "--lazy"]},
+            {"action": "generate-bindings", "arguments": ["--from-xsd", "model.xsd", "model.py"]}
+        ]
+    }
+
+    Jobs run in threads sharing one document loader and one declarations cache, so documents imported
+    by several services are fetched and parsed once, and declarations of their definitions are built once,
+    even with --no-cache (see DocumentLoader.get_definition). Generated code is formatted in one shared process pool.
+    Loader and cache arguments of batch apply to every job, the same arguments of jobs are ignored.
+    """
+    name = "generate-batch"
+    help = "run generate-client and generate-bindings jobs listed in JSON config file"
+
+    @classmethod
+    def add_arguments_to_action_parser(cls, action_parser):
+        action_parser.add_argument("config_filepath", type=str, help="Filepath to JSON config listing jobs")
+        action_parser.add_argument(
+            "--jobs",
+            type=int,
+            default=DEFAULT_JOBS,
+            help=f"number of jobs run at once (default: {DEFAULT_JOBS})"
+        )
+        cls.add_document_loader_arguments(action_parser)
+
+    @classmethod
+    def execute(
+        cls,
+        arguments: Namespace,
+        loader: DocumentLoader = None,
+        declaration_cache: DeclarationCache = None,
+        format_executor: Executor = None
+    ):
+        if arguments.jobs < 1:
+            raise ApplicationException("--jobs must be greater or equal 1")
+        jobs = cls.get_jobs(arguments.config_filepath)
+
+        loader = cls.get_document_loader(arguments)
+        declaration_cache = cls.get_declaration_cache(arguments)
+
+        Logger.info(f"Running {len(jobs)} jobs from {arguments.config_filepath}")
+        failed_jobs = []
+        # forkserver, so formatting processes aren't forked from process running jobs threads.
+        # Pool isn't started at all when no job formats its code
+        start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        format_pool = nullcontext()
+        if any(not job_arguments.no_format for _, job_arguments, _ in jobs):
+            format_pool = ProcessPoolExecutor(mp_context=multiprocessing.get_context(start_method))
+        with format_pool as format_executor:
+            with ThreadPoolExecutor(max_workers=min(arguments.jobs, len(jobs) or 1)) as executor:
+                futures = {
+                    executor.submit(action.execute, job_arguments, loader, declaration_cache, format_executor): description
+                    for action, job_arguments, description in jobs
+                }
+                for future in as_completed(futures):
+                    try:
+                        future.result()
+                    except (Exception, SystemExit) as error:
+                        failed_jobs.append(futures[future])
+                        Logger.warning(f"{futures[future]} failed: {error}")
+
+        if failed_jobs:
+            raise ApplicationException(f"{len(failed_jobs)} of {len(jobs)} jobs failed: {', '.join(failed_jobs)}")
+        Logger.info(f"All {len(jobs)} jobs done")
+
+    @classmethod
+    def get_jobs(cls, config_location: str) -> List[Tuple[Type[Action], Namespace, str]]:
+        """
+        Parses arguments of every job with parser of its action, so invalid config fails before any job starts
+
+        :return: (action, its arguments, description used in logs) for every job
+        """
+        try:
+            with open(config_location) as file:
+                config = json.load(file)
+        except (OSError, ValueError) as error:
+            raise ApplicationException(f"Can't read batch config {config_location}: {error}")
+        if not isinstance(config, dict) or not isinstance(config.get("jobs"), list):
+            raise ApplicationException(f"Batch config {config_location} must be object with list of jobs")
+
+        actions = {action.name: action for action in BATCH_ACTIONS}
+        jobs = []
+        for index, job in enumerate(config["jobs"]):
+            action = actions.get(job.get("action")) if isinstance(job, dict) else None
+            if action is None:
+                raise ApplicationException(
+                    f"Job {index} of {config_location} must have action, one of: {', '.join(actions)}"
+                )
+            job_arguments = [str(argument) for argument in job.get("arguments", [])]
+            description = f"{action.name} {shlex.join(job_arguments)}"
+
+            parser = ArgumentParser(prog=f"{os.path.basename(config_location)} job {index}: {action.name}")
+            action.add_arguments_to_action_parser(parser)
+            try:
+                job_namespace = parser.parse_args(job_arguments)
+            except SystemExit:
+                # argparse already printed what's wrong
+                raise ApplicationException(f"Invalid arguments of job {index} of {config_location}: {description}")
+            if job_namespace.profile:
+                # profiler traces memory of whole process, so jobs running at once would measure each other
+                raise ApplicationException(f"--profile can't be used in job {index} of {config_location}: {description}")
+            jobs.append((action, job_namespace, description))
+        return jobs
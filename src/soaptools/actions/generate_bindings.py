@@ -1,11 +1,23 @@
-import ast
+import os
 from argparse import Namespace
+from concurrent.futures import Executor
+from typing import List, Optional
+
 import lxml.etree
 
 from soaptools.actions.action import Action
+from soaptools.actions.manifest import Manifest, get_manifest_path
+from soaptools.code_generators.index import DeclarationIndex
+from soaptools.exceptions import ApplicationException
 from soaptools.code_generators.python.definitions.generator import TypesCodeGenerator
-from soaptools.helpers.py import get_content_from_uri, Logger, format_code
-from soaptools.soap.schema_parser.parser import SchemaParser
+from soaptools.code_generators.python.definitions.package import TypesPackageGenerator, PACKAGE_LAYOUT
+from soaptools.helpers.lxml import get_full_identifier
+from soaptools.helpers.profiler import Profiler
+from soaptools.helpers.py import Logger, resolve_location, get_file_digest
+from soaptools.soap.cache import DeclarationCache
+from soaptools.soap.loader import DocumentLoader
+from soaptools.soap.namespaces import XS_NAMESPACE
+from soaptools.soap.schema_parser.parser import get_schema_declarations
 from ..soap.wsdl_parser.parser import get_wsdl_declaration
 
 
@@ -18,10 +30,50 @@ class GenerateBindingsAction(Action):
         action_parser.add_argument("--from-wsdl", help="generate bindings from wsdl", action="store_true")
         action_parser.add_argument("--from-xsd", help="generate bindings from xsd", action="store_true")
         action_parser.add_argument("input_filepath", type=str, help="Filepath or URL to input file")
-        action_parser.add_argument("output_filepath", type=str, help="Path to output file")
+        action_parser.add_argument("output_filepath", type=str, help="Path to output file (directory with --layout package)")
+        action_parser.add_argument(
+            "--lazy",
+            help="parse only types reachable from wsdl messages, requires --from-wsdl",
+            action="store_true"
+        )
+        action_parser.add_argument(
+            "--stream",
+            help="parse xsd incrementally, without keeping whole documents in memory, requires --from-xsd",
+            action="store_true"
+        )
+        action_parser.add_argument(
+            "--root",
+            dest="roots",
+            metavar="QNAME",
+            action="append",
+            default=[],
+            help="generate only this element or type and types it depends on, can be repeated. "
+                 "{namespace}name, prefix:name with prefix declared on input document root "
+                 "or name in its target namespace"
+        )
+        cls.add_document_loader_arguments(action_parser)
+        cls.add_output_arguments(action_parser)
+
+    @classmethod
+    def execute(
+        cls,
+        arguments: Namespace,
+        loader: DocumentLoader = None,
+        declaration_cache: DeclarationCache = None,
+        format_executor: Executor = None
+    ):
+        with cls.profile(arguments, {"action": cls.name, "input": arguments.input_filepath}) as profiler:
+            cls.run(arguments, profiler, loader, declaration_cache, format_executor)
 
     @classmethod
-    def execute(cls, arguments: Namespace):
+    def run(
+        cls,
+        arguments: Namespace,
+        profiler: Profiler,
+        loader: DocumentLoader = None,
+        declaration_cache: DeclarationCache = None,
+        format_executor: Executor = None
+    ):
         input_file_path = arguments.input_filepath
         output_file_path = arguments.output_filepath
 
@@ -29,20 +81,150 @@ class GenerateBindingsAction(Action):
 
         if not arguments.from_wsdl and not arguments.from_xsd:
             raise Exception("--from-wsdl or --from-xsd required")
+        if arguments.lazy and not arguments.from_wsdl:
+            raise ApplicationException("--lazy can be used only together with --from-wsdl")
+        if arguments.stream and not arguments.from_xsd:
+            raise ApplicationException("--stream can be used only together with --from-xsd")
+        if arguments.stream and arguments.roots:
+            raise ApplicationException("--root can't be used together with --stream")
+
+        if loader is None:
+            loader = cls.get_document_loader(arguments, profiler)
+            declaration_cache = cls.get_declaration_cache(arguments)
+        is_package = arguments.layout == PACKAGE_LAYOUT
+        manifest_path = get_manifest_path(output_file_path, is_directory=is_package)
+        manifest_directory = os.path.dirname(manifest_path)
+        options = {
+            "action": cls.name,
+            "input": resolve_location(input_file_path),
+            "from_wsdl": arguments.from_wsdl,
+            "from_xsd": arguments.from_xsd,
+            "lazy": arguments.lazy,
+            "roots": sorted(arguments.roots),
+            **cls.get_output_options(arguments),
+        }
+        with profiler.phase("manifest"):
+            previous_manifest = cls.get_previous_manifest(arguments, manifest_path)
+            is_up_to_date = previous_manifest is not None and previous_manifest.is_up_to_date(options, loader, manifest_directory)
+        if is_up_to_date:
+            Logger.info(f"{output_file_path} is up to date")
+            return
 
         Logger.info(f"Parsing {input_file_path}")
-        if arguments.from_wsdl:
-            types_declarations = get_wsdl_declaration(input_file_path).types
-        elif arguments.from_xsd:
-            input_file_content = get_content_from_uri(input_file_path)
-            xsd = lxml.etree.fromstring(input_file_content.encode())
-            types_declarations = SchemaParser(xsd).get_declarations()
+        with profiler.phase("parse"):
+            if arguments.from_wsdl:
+                types_declarations = get_wsdl_declaration(input_file_path, loader, declaration_cache, arguments.lazy).types
+                index = DeclarationIndex(types_declarations)
+                roots = cls.get_roots(arguments, loader, index)
+            elif arguments.from_xsd:
+                roots = cls.get_roots(arguments, loader)
+                # with roots, declarations which can't be reached from them aren't even parsed
+                types_declarations = get_schema_declarations(
+                    input_file_path, loader, declaration_cache, roots, stream=arguments.stream
+                )
+                index = DeclarationIndex(types_declarations)
+        profiler.count("declarations", len(types_declarations))
+
+        roots_declarations = None
+        if roots is not None:
+            roots_declarations = []
+            missing_roots = []
+            for root in roots:
+                # element and type can share QName, element identical to type is then skipped by generator
+                root_declarations = [
+                    declaration for declaration in [index.get_element(root), index.get_type(root)] if declaration is not None
+                ]
+                if not root_declarations:
+                    missing_roots.append(root)
+                roots_declarations.extend(root_declarations)
+            if missing_roots:
+                raise ApplicationException(f"{', '.join(missing_roots)} not found in {input_file_path}")
+        types_generator = TypesCodeGenerator(types_declarations, roots_declarations, index)
 
-        Logger.info("Generating python code")
-        code = format_code(ast.unparse(TypesCodeGenerator(types_declarations).generate()))
+        if is_package:
+            Logger.info(f"Generating python package {output_file_path}")
+            with profiler.phase("generate"):
+                modules = TypesPackageGenerator(types_generator, arguments.chunk_size).generate()
+            files = cls.write_modules(arguments, output_file_path, modules, previous_manifest, format_executor, profiler)
+            if previous_manifest is not None:
+                previous_manifest.remove_stale_files(output_file_path, files)
+            Manifest(options, loader.get_sources(input_file_path), files).save(manifest_path)
+            return
 
-        Logger.info(f"Writing to {output_file_path}")
+        Logger.info(f"Generating python code to {output_file_path}")
+        # classes are written as soon as they're generated, into temporary file, so no partial output is left
+        temporary_path = f"{output_file_path}.{os.getpid()}.tmp"
         try:
-            open(output_file_path, mode="w").write(code)
+            output = open(temporary_path, mode="w")
         except Exception:
             print(f"Write to {output_file_path} failed. Is this valid filepath?")
+            return
+        try:
+            # module is written class by class, so writing is counted in generate phase
+            with output, profiler.phase("generate"):
+                types_generator.generate_to(output, cls.get_code_formatter(arguments, profiler))
+            os.replace(temporary_path, output_file_path)
+        finally:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+        profiler.count("modules")
+        profiler.count("written_modules")
+        profiler.count("classes", types_generator.generated_types_registry.classes_count)
+        if arguments.compile:
+            with profiler.phase("compile"):
+                cls.compile_module(arguments, output_file_path)
+        else:
+            cls.remove_compiled_module(output_file_path)
+
+        # module is written as a whole, so only its output digest is recorded
+        files = {os.path.basename(output_file_path): {"source": None, "output": get_file_digest(output_file_path)}}
+        Manifest(options, loader.get_sources(input_file_path), files).save(manifest_path)
+
+    @classmethod
+    def get_roots(cls, arguments: Namespace, loader: DocumentLoader, index: DeclarationIndex = None) -> Optional[List[str]]:
+        """
+        Identifiers ({namespace}name) of --root QNames, None if none were passed.
+        Input document is loaded only if some of them aren't in {namespace}name form already
+
+        :param index: declarations of wsdl, required with --from-wsdl. Bare name is looked up in target namespaces
+            of its embedded schemas, as one of wsdl:definitions is usually different
+        """
+        if not arguments.roots:
+            return None
+        roots = []
+        document = None
+        for root in arguments.roots:
+            if root.startswith("{"):
+                roots.append(root)
+                continue
+            if document is None:
+                document = loader.load(arguments.input_filepath)
+            if ":" not in root:
+                if arguments.from_wsdl:
+                    roots.append(cls.get_wsdl_root(root, document, index))
+                else:
+                    roots.append(f"{{{document.attrib.get('targetNamespace')}}}{root}")
+            elif root.split(":")[0] in document.nsmap:
+                roots.append(get_full_identifier(root, document.nsmap))
+            else:
+                raise ApplicationException(f"Prefix of --root {root} isn't declared on root of {arguments.input_filepath}")
+        return roots
+
+    @classmethod
+    def get_wsdl_root(cls, name: str, document: lxml.etree._Element, index: DeclarationIndex) -> str:
+        """
+        Identifier of bare --root name, in target namespace of one of schemas embedded in wsdl document
+        """
+        namespaces = dict.fromkeys(
+            schema.attrib.get("targetNamespace") for schema in document.iter(f"{{{XS_NAMESPACE}}}schema")
+        )
+        identifiers = [
+            f"{{{namespace}}}{name}" for namespace in namespaces
+            if index.get_element(f"{{{namespace}}}{name}") is not None or index.get_type(f"{{{namespace}}}{name}") is not None
+        ]
+        if len(identifiers) > 1:
+            raise ApplicationException(
+                f"--root {name} is declared in several namespaces ({', '.join(identifiers)}), pass {{namespace}}{name} instead"
+            )
+        # not found one is reported together with other missing roots
+        return identifiers[0] if identifiers else f"{{{document.attrib.get('targetNamespace')}}}{name}"
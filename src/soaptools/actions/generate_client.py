@@ -1,12 +1,27 @@
 import ast
 import os
+import threading
 from argparse import Namespace
+from concurrent.futures import Executor
+from typing import Dict, List, Optional
 
 from soaptools.actions.action import Action
-from soaptools.helpers.py import Logger, format_code
+from soaptools.actions.manifest import Manifest, get_manifest_path
+from soaptools.exceptions import ApplicationException
+from soaptools.helpers.profiler import Profiler
+from soaptools.helpers.py import Logger, resolve_location
+from soaptools.soap.cache import DeclarationCache
+from soaptools.soap.loader import DocumentLoader
 from ..code_generators.python.client import ClientGenerator
+from ..code_generators.python.definitions.generator import TypesCodeGenerator
+from ..code_generators.python.definitions.package import INIT_MODULE_NAME, SharedTypesPackage, get_init_module_classes
 from ..soap.wsdl_parser.parser import get_wsdl_declaration
 
+# shared types package directory -> lock held while package is merged and written,
+# as generate-batch can run several clients sharing it at once
+SHARED_TYPES_LOCKS: Dict[str, threading.Lock] = {}
+SHARED_TYPES_LOCKS_LOCK = threading.Lock()
+
 
 class GenerateClientAction(Action):
     name = "generate-client"
@@ -16,28 +31,166 @@ class GenerateClientAction(Action):
     def add_arguments_to_action_parser(cls, action_parser):
         action_parser.add_argument("input_filepath", type=str, help="Filepath or URL to WSDL")
         action_parser.add_argument("output_folder_name", type=str, help="output folder name")
+        action_parser.add_argument(
+            "--lazy",
+            help="parse only types reachable from wsdl messages, instead of every type in wsdl",
+            action="store_true"
+        )
+        action_parser.add_argument(
+            "--shared-types",
+            metavar="PACKAGE",
+            help="put types of --shared-namespace namespaces into this package, shared by all clients generated with it, "
+                 "instead of client types. Absolute import name, e.g. soap_common"
+        )
+        action_parser.add_argument(
+            "--shared-namespace",
+            dest="shared_namespaces",
+            metavar="NAMESPACE",
+            action="append",
+            default=[],
+            help="namespace whose types go into --shared-types package, can be repeated"
+        )
+        action_parser.add_argument(
+            "--shared-types-dir",
+            help="directory of --shared-types package (default: next to output folder, at path of package name)"
+        )
+        cls.add_document_loader_arguments(action_parser)
+        cls.add_output_arguments(action_parser)
+
+    @classmethod
+    def execute(
+        cls,
+        arguments: Namespace,
+        loader: DocumentLoader = None,
+        declaration_cache: DeclarationCache = None,
+        format_executor: Executor = None
+    ):
+        with cls.profile(arguments, {"action": cls.name, "input": arguments.input_filepath}) as profiler:
+            cls.run(arguments, profiler, loader, declaration_cache, format_executor)
 
     @classmethod
-    def execute(cls, arguments: Namespace):
+    def run(
+        cls,
+        arguments: Namespace,
+        profiler: Profiler,
+        loader: DocumentLoader = None,
+        declaration_cache: DeclarationCache = None,
+        format_executor: Executor = None
+    ):
         input_file_path = arguments.input_filepath
         output_folder_name = arguments.output_folder_name
 
+        if bool(arguments.shared_types) != bool(arguments.shared_namespaces):
+            raise ApplicationException("--shared-types and --shared-namespace have to be used together")
+        shared_types = None
+        if arguments.shared_types:
+            shared_types = SharedTypesPackage(arguments.shared_types, arguments.shared_namespaces)
+
+        if loader is None:
+            loader = cls.get_document_loader(arguments, profiler)
+            declaration_cache = cls.get_declaration_cache(arguments)
+        manifest_path = get_manifest_path(output_folder_name, is_directory=True)
+        options = {
+            "action": cls.name,
+            "input": resolve_location(input_file_path),
+            "lazy": arguments.lazy,
+            "shared_types": arguments.shared_types,
+            "shared_namespaces": sorted(arguments.shared_namespaces),
+            "shared_types_dir": cls.get_shared_types_directory(arguments),
+            **cls.get_output_options(arguments),
+        }
+        with profiler.phase("manifest"):
+            previous_manifest = cls.get_previous_manifest(arguments, manifest_path)
+            is_up_to_date = previous_manifest is not None and previous_manifest.is_up_to_date(options, loader, output_folder_name)
+            if is_up_to_date and shared_types is not None:
+                # client imports shared types package, which has to be in place too
+                is_up_to_date = cls.has_shared_types(arguments, previous_manifest.shared_classes)
+        if is_up_to_date:
+            Logger.info(f"{output_folder_name} is up to date")
+            return
+
         Logger.info("Parsing wsdl")
-        wsdl_declaration = get_wsdl_declaration(input_file_path)
+        with profiler.phase("parse"):
+            wsdl_declaration = get_wsdl_declaration(
+                input_file_path,
+                loader,
+                declaration_cache,
+                arguments.lazy
+            )
+        profiler.count("declarations", len(wsdl_declaration.types))
 
         Logger.info("Generating python code")
 
         # 1. check messages
         # 2. generate only necessary types (filter out from wsdl_declaration.types ?)
         # 3. generate client
-        modules = ClientGenerator.generate_client_from_wsdl_declaration(wsdl_declaration)
+        with profiler.phase("generate"):
+            modules = ClientGenerator.generate_client_from_wsdl_declaration(
+                wsdl_declaration,
+                arguments.layout,
+                arguments.chunk_size,
+                shared_types
+            )
+        modules["__init__"] = ast.Module(body=[], type_ignores=[])
+
+        files = cls.write_modules(arguments, output_folder_name, modules, previous_manifest, format_executor, profiler)
+        if previous_manifest is not None:
+            previous_manifest.remove_stale_files(output_folder_name, files)
+        shared_classes = sorted(shared_types.get_external_classes()) if shared_types is not None else None
+        Manifest(options, loader.get_sources(input_file_path), files, shared_classes=shared_classes).save(manifest_path)
 
+        if shared_types is not None:
+            cls.write_shared_types(arguments, shared_types, format_executor, profiler)
+
+    @classmethod
+    def get_shared_types_directory(cls, arguments: Namespace) -> Optional[str]:
+        if not arguments.shared_types:
+            return None
+        if arguments.shared_types_dir:
+            return os.path.abspath(arguments.shared_types_dir)
+        output_parent = os.path.dirname(os.path.abspath(arguments.output_folder_name))
+        return os.path.join(output_parent, *arguments.shared_types.split("."))
+
+    @classmethod
+    def has_shared_types(cls, arguments: Namespace, shared_classes: List[str]) -> bool:
+        """
+        True if shared types package wasn't modified or removed since it was written, and still exports
+        every class client imports from it
+        """
+        directory = cls.get_shared_types_directory(arguments)
+        manifest = Manifest.load(get_manifest_path(directory, is_directory=True))
+        if manifest is None or not manifest.is_intact(directory):
+            return False
         try:
-            os.mkdir(output_folder_name)
-        except FileExistsError:
-            pass
+            with open(os.path.join(directory, INIT_MODULE_NAME + ".py")) as file:
+                init_module = ast.parse(file.read())
+        except OSError:
+            return False
+        return set(shared_classes) <= set(get_init_module_classes(init_module))
+
+    @classmethod
+    def write_shared_types(
+        cls,
+        arguments: Namespace,
+        shared_types: SharedTypesPackage,
+        format_executor: Executor = None,
+        profiler: Profiler = None
+    ):
+        """
+        Merges shared types generated for client into package written by earlier runs
+        """
+        directory = cls.get_shared_types_directory(arguments)
+        with SHARED_TYPES_LOCKS_LOCK:
+            lock = SHARED_TYPES_LOCKS.setdefault(directory, threading.Lock())
+        with lock:
+            Logger.info(f"Updating shared types package {arguments.shared_types} in {directory}")
+            manifest_path = get_manifest_path(directory, is_directory=True)
+            previous_manifest = cls.get_previous_manifest(arguments, manifest_path)
+            shared_types.add_existing_modules(cls.read_modules(directory))
+            modules = shared_types.generate(TypesCodeGenerator([]).get_imports())
 
-        open(output_folder_name + "\\" + "__init__.py", mode="w").write("")
-        for module_name, module_ast in modules.items():
-            open(output_folder_name + "\\" + module_name + ".py", mode="w").write(format_code(ast.unparse(module_ast)))
+            files = cls.write_modules(arguments, directory, modules, previous_manifest, format_executor, profiler)
+            if previous_manifest is not None:
+                previous_manifest.remove_stale_files(directory, files)
+            Manifest({"shared_types": arguments.shared_types, **cls.get_output_options(arguments)}, {}, files).save(manifest_path)
 
@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+import soaptools
+from soaptools.helpers.py import get_file_digest
+from soaptools.soap.loader import DocumentLoader
+
+MANIFEST_FILE_NAME = ".soaptools-manifest.json"
+
+
+def get_manifest_path(output_path: str, is_directory: bool) -> str:
+    """
+    Manifest of directory output (package, client) is kept inside of it, of single module next to it
+    """
+    if is_directory:
+        return os.path.join(output_path, MANIFEST_FILE_NAME)
+    directory, file_name = os.path.split(os.path.abspath(output_path))
+    return os.path.join(directory, f".{file_name}{MANIFEST_FILE_NAME}")
+
+
+def get_code_digest(code: str) -> str:
+    return hashlib.sha256(code.encode()).hexdigest()
+
+
+class Manifest:
+    """
+    Record of generation run, written next to its output: soaptools version, options affecting output,
+    sha256 of every input document and of every written file.
+
+    files: path relative to manifest directory -> {"source": digest of generated code before formatting
+    or None if unknown, "output": digest of written file}
+    shared_classes: names of classes client imports from shared types package
+    """
+    version: str
+    options: Dict
+    sources: Dict[str, str]
+    files: Dict[str, Dict[str, Optional[str]]]
+    shared_classes: List[str]
+
+    def __init__(
+        self,
+        options: Dict,
+        sources: Dict[str, str] = None,
+        files: Dict[str, Dict[str, Optional[str]]] = None,
+        version: str = soaptools.__version__,
+        shared_classes: List[str] = None
+    ):
+        self.version = version
+        self.options = options
+        self.sources = sources or {}
+        self.files = files or {}
+        self.shared_classes = shared_classes or []
+
+    @classmethod
+    def load(cls, path: str) -> Optional["Manifest"]:
+        try:
+            with open(path) as file:
+                content = json.load(file)
+            return cls(content["options"], content["sources"], content["files"], content["version"], content["shared_classes"])
+        except Exception:
+            # missing, unreadable or written by incompatible version
+            return None
+
+    def save(self, path: str):
+        temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary_path, mode="w") as file:
+            json.dump(
+                {
+                    "version": self.version,
+                    "options": self.options,
+                    "sources": self.sources,
+                    "files": self.files,
+                    "shared_classes": self.shared_classes,
+                },
+                file,
+                indent=2,
+                sort_keys=True
+            )
+        os.replace(temporary_path, path)
+
+    def is_up_to_date(self, options: Dict, loader: DocumentLoader, directory: str) -> bool:
+        """
+        True if generation with options would give the same output as one recorded: version and options
+        are the same, no input document changed and no written file was modified or removed since
+        """
+        if self.version != soaptools.__version__ or self.options != options or not self.sources:
+            return False
+        for location, digest in self.sources.items():
+            try:
+                if loader.get_digest(location) != digest:
+                    return False
+            except Exception:
+                return False
+        return self.is_intact(directory)
+
+    def is_intact(self, directory: str) -> bool:
+        """
+        True if no written file was modified or removed since
+        """
+        return all(self.__is_file_intact(directory, path) for path in self.files)
+
+    def get_unchanged_file(self, directory: str, path: str, source_digest: str) -> Optional[Dict[str, Optional[str]]]:
+        """
+        Record of file, if it was generated from the same code and wasn't modified since, so it doesn't have to be
+        formatted and written again
+        """
+        record = self.files.get(path)
+        if record is None or record["source"] != source_digest or not self.__is_file_intact(directory, path):
+            return None
+        return record
+
+    def remove_stale_files(self, directory: str, files: Dict[str, Dict[str, Optional[str]]]):
+        """
+        Removes recorded files which aren't part of output anymore, unless they were modified since
+        """
+        for path in self.files:
+            if path not in files and self.__is_file_intact(directory, path):
+                os.remove(os.path.join(directory, *path.split("/")))
+
+    def __is_file_intact(self, directory: str, path: str) -> bool:
+        try:
+            return get_file_digest(os.path.join(directory, *path.split("/"))) == self.files[path]["output"]
+        except OSError:
+            return False
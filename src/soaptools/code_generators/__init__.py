@@ -1,4 +1,3 @@
-import copy
 from typing import List
 
 from soaptools.soap.schema_parser.declarations import TypeDeclaration
@@ -6,7 +5,8 @@ from soaptools.soap.schema_parser.declarations import TypeDeclaration
 
 class CodeGenerator:
     def __init__(self, declarations: List[TypeDeclaration]):
-        self.declarations = copy.deepcopy(declarations)
+        # declarations are immutable, so they are shared instead of copied
+        self.declarations = declarations
 
     def generate(self):
         raise NotImplementedError()
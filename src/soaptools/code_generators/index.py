@@ -0,0 +1,46 @@
+from typing import Dict, List, Optional
+
+from soaptools.soap.schema_parser.declarations import Declaration, TypeDeclaration, ElementDeclaration
+from soaptools.soap.wsdl_parser.subparsers.message.declarations import MessageDeclaration
+
+
+class DeclarationIndex:
+    """
+    Lookup tables of declarations, built once and shared by code generators.
+    When identifiers repeat, first declaration wins, same as searching through declarations list.
+    """
+    declarations: Dict[str, Declaration]
+    types: Dict[str, TypeDeclaration]
+    elements: Dict[str, ElementDeclaration]
+    messages: Dict[str, MessageDeclaration]
+
+    def __init__(self, declarations: List[Declaration], messages: List[MessageDeclaration] = None):
+        self.declarations = {}
+        self.types = {}
+        self.elements = {}
+        self.messages = {}
+
+        for declaration in declarations:
+            self.declarations.setdefault(declaration.identifier, declaration)
+            if isinstance(declaration, TypeDeclaration):
+                self.types.setdefault(declaration.identifier, declaration)
+            elif isinstance(declaration, ElementDeclaration):
+                self.elements.setdefault(declaration.identifier, declaration)
+
+        for message in messages or []:
+            self.messages.setdefault(message.name, message)
+
+    def get_declaration(self, identifier: str) -> Optional[Declaration]:
+        return self.declarations.get(identifier)
+
+    def get_type(self, identifier: str) -> Optional[TypeDeclaration]:
+        return self.types.get(identifier)
+
+    def get_element(self, identifier: str) -> Optional[ElementDeclaration]:
+        return self.elements.get(identifier)
+
+    def get_message(self, name: str) -> Optional[MessageDeclaration]:
+        """
+        :param name: message name, bare, prefixed as in <wsdl:input message="tns:name"/> or qualified as {namespace}name
+        """
+        return self.messages.get(name.split("}")[-1].split(":")[-1])
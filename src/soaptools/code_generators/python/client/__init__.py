@@ -8,8 +8,11 @@ import lxml.etree
 import ast
 import functools
 
+from soaptools.code_generators.index import DeclarationIndex
 from soaptools.code_generators.python.client.types import Message
 from soaptools.code_generators.python.definitions.generator import TypesCodeGenerator
+from soaptools.code_generators.python.definitions.package import TypesPackageGenerator, SharedTypesPackage, \
+    MODULE_LAYOUT, PACKAGE_LAYOUT, get_referenced_names
 from soaptools.soap.wsdl_parser.declarations import WsdlDeclaration
 from soaptools.soap.wsdl_parser.subparsers.message.declarations import MessageDeclaration
 
@@ -35,6 +38,8 @@ class SoapClient(zeep.Client):
     """
     At this time its just Facade for zeep client, with typing and stuff
     """
+    # decode responses lazily, each field on its first read, for handlers reading a few fields of big responses
+    lazy_responses = False
 
     def __init__(self, *args, **kwargs):
         super(SoapClient, self).__init__(*args, **kwargs)
@@ -45,14 +50,27 @@ class SoapClient(zeep.Client):
 
     def _execute_action(self, action_name: str, input_object: Message, output_class: Type[T]) -> T:
         response = getattr(self.service, action_name)(**input_object.get_request_arguments())
-        return output_class.from_lxml(response)
+        return output_class.from_lxml(response, self.lazy_responses)
 
 
 class ClientGenerator:
     @classmethod
-    def generate_client_from_wsdl_declaration(cls, wsdl_declaration: WsdlDeclaration) -> Dict[str, ast.Module]:
+    def generate_client_from_wsdl_declaration(
+        cls,
+        wsdl_declaration: WsdlDeclaration,
+        types_layout: str = MODULE_LAYOUT,
+        types_chunk_size: int = None,
+        shared_types: SharedTypesPackage = None
+    ) -> Dict[str, ast.Module]:
+        """
+        :param types_layout: with PACKAGE_LAYOUT types are split into "types" package, see TypesPackageGenerator
+        :param shared_types: classes of its namespaces go there instead of client types, which import them from it.
+            Shared package itself is generated by caller
+        :return: module name -> module, modules of types package are named "types/<module>"
+        """
         modules_map = {}
-        messages_mapping = cls.__get_messages_classes_mapping(wsdl_declaration)
+        index = DeclarationIndex(wsdl_declaration.types, wsdl_declaration.messages)
+        messages_mapping = cls.__get_messages_classes_mapping(wsdl_declaration, index)
         all_messages = functools.reduce(
             lambda acc, curr: acc + list(curr.values()),
             list(messages_mapping.values()),
@@ -64,10 +82,18 @@ class ClientGenerator:
             for assignment in filter(lambda elem: isinstance(elem, ast.Assign), message.body):
                 assignment: ast.Assign
                 type_identifier = next(filter(lambda keyword: keyword.arg == "type", assignment.value.keywords)).value.id
-                types_to_generate.append(next(filter(lambda declaration: declaration.identifier == type_identifier, wsdl_declaration.types)))
+                types_to_generate.append(index.get_declaration(type_identifier))
 
-        types_generator = TypesCodeGenerator(wsdl_declaration.types, types_to_generate)
-        modules_map["types"] = types_generator.generate()
+        types_generator = TypesCodeGenerator(wsdl_declaration.types, types_to_generate, index)
+        if types_layout == PACKAGE_LAYOUT:
+            types_package_generator = TypesPackageGenerator(types_generator, types_chunk_size, shared_types)
+            for module_name, module in types_package_generator.generate().items():
+                modules_map[f"types/{module_name}"] = module
+        elif shared_types is not None:
+            modules_map["types"] = cls.__get_types_module_with_shared_types(types_generator, shared_types)
+        else:
+            modules_map["types"] = types_generator.generate()
+        shared_classes = shared_types.get_external_classes() if shared_types is not None else {}
 
         types_names_to_import = []
         for message in all_messages:
@@ -82,21 +108,27 @@ class ClientGenerator:
                 constructor_def = next(filter(lambda elem: isinstance(elem, ast.FunctionDef) and elem.name == "__init__",  message.body))
                 next(filter(lambda arg: arg.arg == assignment.targets[0].id, constructor_def.args.args)).annotation = ast.Name(type_name)
 
-        modules_map["messages"] = ast.Module(
-            body=[
-                ast.ImportFrom(
-                    module="soaptools.code_generators.python.client.types",
-                    names=[ast.alias(name="Message"), ast.alias(name="Part")],
-                    level=0
-                ),
+        messages_imports = [
+            ast.ImportFrom(
+                module="soaptools.code_generators.python.client.types",
+                names=[ast.alias(name="Message"), ast.alias(name="Part")],
+                level=0
+            ),
+            ast.ImportFrom(
+                module=".types",
+                names=[ast.alias(name=type_name) for type_name in types_names_to_import if type_name not in shared_classes],
+                level=0
+            ),
+        ]
+        if shared_types_names := [type_name for type_name in types_names_to_import if type_name in shared_classes]:
+            messages_imports.append(
                 ast.ImportFrom(
-                    module=".types",
-                    names=[ast.alias(name=type_name) for type_name in types_names_to_import],
+                    module=shared_types.package_name,
+                    names=[ast.alias(name=type_name) for type_name in shared_types_names],
                     level=0
-                ),
-            ] + all_messages,
-            type_ignores=[]
-        )
+                )
+            )
+        modules_map["messages"] = ast.Module(body=messages_imports + all_messages, type_ignores=[])
 
         modules_map["client"] = ast.Module(
             body=[
@@ -118,17 +150,33 @@ class ClientGenerator:
         return modules_map
 
     @classmethod
-    def __get_messages_classes_mapping(cls, wsdl_declaration: WsdlDeclaration) -> dict[
+    def __get_types_module_with_shared_types(
+        cls,
+        types_generator: TypesCodeGenerator,
+        shared_types: SharedTypesPackage
+    ) -> ast.Module:
+        class_defs = []
+        types_generator.generate_classes(
+            lambda identifier, class_def: shared_types.add_class(identifier, class_def) or class_defs.append(class_def)
+        )
+        shared_classes = shared_types.get_external_classes()
+        imports = types_generator.get_imports()
+        if shared_names := sorted({
+            name for class_def in class_defs for name in get_referenced_names(class_def) if name in shared_classes
+        }):
+            imports.append(
+                ast.ImportFrom(module=shared_types.package_name, names=[ast.alias(name=name) for name in shared_names], level=0)
+            )
+        return ast.Module(body=imports + class_defs, type_ignores=[])
+
+    @classmethod
+    def __get_messages_classes_mapping(cls, wsdl_declaration: WsdlDeclaration, index: DeclarationIndex) -> dict[
         str, dict[str, MessageDeclaration]]:
         operations_mapping: Dict[str] = {}
 
         for operation in wsdl_declaration.port_type.operations:
-            input_message: MessageDeclaration = next(
-                filter(lambda message: message.name == operation.input.message.split("}")[-1],
-                       wsdl_declaration.messages))
-            output_message: MessageDeclaration = next(
-                filter(lambda message: message.name == operation.output.message.split("}")[-1],
-                       wsdl_declaration.messages))
+            input_message: MessageDeclaration = index.get_message(operation.input.message)
+            output_message: MessageDeclaration = index.get_message(operation.output.message)
             operations_mapping[operation.name] = {"input_message": input_message, "output_message": output_message}
 
             for input_output in ["input_message", "output_message"]:
@@ -21,9 +21,15 @@ class Message:
         return self.parameters.xml_value
 
     @classmethod
-    def from_lxml(cls, node: lxml.etree._Element):
+    def from_lxml(cls, node: lxml.etree._Element, lazy: bool = False):
+        """
+        :param lazy: decode parameters lazily, field by field on first read, see ComplexType.from_lxml_node
+        """
         # same here, looks like there is <part name="parameters"> convention kept everywhere
         return cls(
-            parameters=cls.parameters.type.from_lxml_node(node.getroottree().find(f"//{cls.parameters.type.identifier}"))
+            parameters=cls.parameters.type.from_lxml_node(
+                node.getroottree().find(f"//{cls.parameters.type.identifier}"),
+                lazy
+            )
         )
 
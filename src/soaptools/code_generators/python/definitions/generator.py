@@ -1,8 +1,8 @@
 import ast
-import copy
 from collections import OrderedDict
-from typing import List
+from typing import List, Callable, TextIO
 
+from soaptools.code_generators.index import DeclarationIndex
 from soaptools.code_generators.python.definitions.types import BASE_TYPES, AnyType
 from soaptools.helpers.py import Duration
 from soaptools.soap.schema_parser.declarations import SimpleTypeDeclaration, ComplexTypeDeclaration, ElementDeclaration, Declaration, \
@@ -14,19 +14,32 @@ from soaptools.soap.schema_parser.restriction_elements import MinInclusiveRestri
 
 
 class TypesRegistry:
-    def __init__(self):
+    def __init__(self, emit: Callable[[str, ast.ClassDef], None] = None):
+        """
+        :param emit: called with identifier and class definition as soon as it's added. Class is complete then
+        and all classes it depends on were added before it. Emitted definitions aren't kept in registry, only their names
+        """
         self.__storage = OrderedDict()
+        self.__emit = emit
+        self.classes_count = 0
 
     def add_predefined_base_type(self, definition: AnyType):
         self.__storage["type" + definition.identifier] = {"name": "xs." + definition.__name__, "def": None}
 
     def add_type_class_def(self, identifier: str, class_def: ast.ClassDef):
         composite_identifier = "type" + identifier
-        self.__storage[composite_identifier] = {"name": class_def.name, "def": class_def}
+        self.__storage[composite_identifier] = {"name": class_def.name, "def": self.__store(identifier, class_def)}
 
     def add_element_class_def(self, identifier: str, class_def: ast.ClassDef):
         composite_identifier = "element" + identifier
-        self.__storage[composite_identifier] = {"name": class_def.name, "def": class_def}
+        self.__storage[composite_identifier] = {"name": class_def.name, "def": self.__store(identifier, class_def)}
+
+    def __store(self, identifier: str, class_def: ast.ClassDef):
+        self.classes_count += 1
+        if self.__emit is None:
+            return class_def
+        self.__emit(identifier, class_def)
+        return None
 
     def get_type_by_identifier(self, identifier):
         return self.__storage.get("type" + identifier)
@@ -40,23 +53,68 @@ class TypesRegistry:
 
 class TypesCodeGenerator:
 
-    def __init__(self, all_declarations: List[TypeDeclaration], generate_only_declarations: List[TypeDeclaration] = None):
+    def __init__(
+        self,
+        all_declarations: List[TypeDeclaration],
+        generate_only_declarations: List[TypeDeclaration] = None,
+        index: DeclarationIndex = None
+    ):
         """
 
         :param all_declarations:
         :param generate_only_declarations: sublist of all_declarations
+        :param index: index of all_declarations, built if not passed
         """
 
-        self.declarations = copy.deepcopy(all_declarations)
-        self.generate_only_declarations = copy.deepcopy(generate_only_declarations)
-        self.generated_types_registry = TypesRegistry()
+        self.declarations = all_declarations
+        self.generate_only_declarations = generate_only_declarations
+        self.index = index or DeclarationIndex(self.declarations)
+        self.generated_types_registry = self.__create_types_registry()
+
+    def generate(self) -> ast.Module:
+        self.__generate_declarations()
+        return ast.Module(
+            body=self.get_imports() + list(self.generated_types_registry.get_all_class_definitions()),
+            type_ignores=[]
+        )
+
+    def generate_classes(self, emit: Callable[[str, ast.ClassDef], None]):
+        """
+        Passes every generated class, with identifier of its declaration, to emit as soon as it's complete,
+        classes it depends on always go first. Class definitions aren't kept after that.
+        """
+        self.generated_types_registry = self.__create_types_registry(emit)
+        self.__generate_declarations()
+
+    def generate_to(self, output: TextIO, format_code: Callable[[str], str] = None):
+        """
+        Writes module class by class, each one as soon as it's generated, so neither ast nor source
+        of whole module is ever in memory. Result is the same as of ast.unparse(self.generate()).
 
+        :param format_code: applied to imports and to every class separately, black gives the same result
+        for them as for whole module
+        """
+        format_code = format_code or (lambda code: code)
+
+        def emit(identifier: str, class_def: ast.ClassDef):
+            output.write("\n\n" + format_code(ast.unparse(class_def)))
+
+        output.write(format_code(ast.unparse(ast.Module(body=self.get_imports(), type_ignores=[]))))
+        self.generate_classes(emit)
+
+    @staticmethod
+    def __create_types_registry(emit: Callable[[str, ast.ClassDef], None] = None) -> TypesRegistry:
+        registry = TypesRegistry(emit)
         for base_type in BASE_TYPES:
-            self.generated_types_registry.add_predefined_base_type(base_type)
+            registry.add_predefined_base_type(base_type)
+        return registry
 
-    def generate(self) -> ast.Module:
+    def get_imports(self) -> List[ast.stmt]:
+        """
+        Imports every generated module needs
+        """
         # todo: dont import unnecessary things
-        acc = [
+        return [
             ast.ImportFrom(
                 module="soaptools.code_generators.python.definitions.types.base",
                 names=[
@@ -90,26 +148,21 @@ class TypesCodeGenerator:
                 level=0
             ),
         ]
+
+    def __generate_declarations(self):
         declarations_to_generate = self.generate_only_declarations or self.declarations
         for declaration in declarations_to_generate:
             # ignore if element declaration is identical to type declaration:
-            if (
-                isinstance(declaration, ElementDeclaration) and
-                any(filter(lambda i_decl: i_decl.identifier == declaration.identifier and isinstance(i_decl, TypeDeclaration), self.declarations))
-            ):
+            if isinstance(declaration, ElementDeclaration) and self.index.get_type(declaration.identifier):
                 continue
             self.__generate_type_from_declaration(declaration)
-        for class_def in self.generated_types_registry.get_all_class_definitions():
-            acc.append(class_def)
-
-        return ast.Module(body=acc, type_ignores=[])
 
     def __get_type_name_from_identifier(self, identifier):
         generated_type = self.generated_types_registry.get_type_by_identifier(identifier)
         if generated_type:
             return generated_type["name"]
 
-        declaration_to_generate = next(filter(lambda declaration: isinstance(declaration, TypeDeclaration) and declaration.identifier == identifier, self.declarations), None)
+        declaration_to_generate = self.index.get_type(identifier)
         if not declaration_to_generate:
             raise self.TypeNotFoundException(identifier)
         generated_class_def = self.__generate_type_from_declaration(declaration_to_generate)
@@ -136,7 +189,7 @@ class TypesCodeGenerator:
         return class_def
 
     def __generate_simple_type_class(self, declaration: SimpleTypeDeclaration):
-        body = []
+        body = [self.__get_slots()]
         base_class_name = "SimpleType"
         if declaration.restriction.base:
             base_class_name = self.__get_type_name_from_identifier(declaration.restriction.base)
@@ -159,7 +212,7 @@ class TypesCodeGenerator:
         )
 
     def __generate_complex_type_class(self, declaration: ComplexTypeDeclaration, class_name:str = None):
-        body = []
+        body = [self.__get_slots()]
         constructor_attributes = []
 
         for sub_element in declaration.elements:
@@ -191,7 +244,7 @@ class TypesCodeGenerator:
             return ast.ClassDef(
                 name=class_name,
                 bases=[ast.Name(id=self.__get_type_name_from_identifier(type))],
-                body=[self.__get_metadata_class(declaration)],
+                body=[self.__get_slots(), self.__get_metadata_class(declaration)],
                 decorator_list=[],
                 keywords=[]
             )
@@ -205,7 +258,7 @@ class TypesCodeGenerator:
         element_kwargs = {}
         for attr_name in element_kwargs_names:
             declaration_attr_name = to_snake_case(attr_name)
-            if declaration_attr_name not in sub_element.__dict__ or sub_element.__dict__[declaration_attr_name] == None:
+            if getattr(sub_element, declaration_attr_name, None) is None:
                 continue
             element_kwargs[to_snake_case(attr_name)] = ast.Constant(value=getattr(sub_element, declaration_attr_name))
 
@@ -213,7 +266,7 @@ class TypesCodeGenerator:
             element_kwargs["min_occurs"] = ast.Constant(value=sub_element.min_occurs)
         if sub_element.max_occurs != 1:
             element_kwargs["max_occurs"] = ast.Constant(value=sub_element.max_occurs)
-        if "type" in sub_element.__dict__:  # add find_type
+        if sub_element.type is not None:  # add find_type
             element_kwargs["type"] = ast.Name(id=self.__get_type_name_from_identifier(sub_element.type))
 
         return ast.Call(
@@ -225,6 +278,10 @@ class TypesCodeGenerator:
             ]
         )
 
+    def __get_slots(self):
+        # instances keep their values in slots of base classes, without __dict__
+        return ast.Assign(targets=[ast.Name(id="__slots__")], value=ast.Tuple(elts=[]), lineno=1)
+
     def __get_metadata_info(self, declaration: Declaration):
         return {
             "name": declaration.name,
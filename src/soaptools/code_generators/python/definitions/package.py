@@ -0,0 +1,365 @@
+import ast
+import keyword
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from soaptools.code_generators.python.definitions.generator import TypesCodeGenerator
+from soaptools.exceptions import ApplicationException
+from soaptools.helpers.py import get_strongly_connected_components
+
+MODULE_LAYOUT = "module"
+PACKAGE_LAYOUT = "package"
+LAYOUTS = [MODULE_LAYOUT, PACKAGE_LAYOUT]
+
+INIT_MODULE_NAME = "__init__"
+
+# PEP 562: submodule is imported when one of its classes is accessed for the first time, then cached in globals
+LAZY_LOADING_TEMPLATE = """
+import importlib
+
+
+def __getattr__(name):
+    module_name = _MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return __all__
+"""
+
+
+def get_namespace_module_name(namespace: str) -> str:
+    """
+    Python module name for target namespace, e.g. http://tempuri.org/Orders.xsd -> tempuri_org_orders_xsd
+    """
+    name = re.sub(r"^[a-z]+:(//)?", "", namespace.lower())
+    name = re.sub(r"[^a-z0-9]+", "_", name).strip("_") or "types"
+    if name[0].isdigit() or keyword.iskeyword(name):
+        name = f"ns_{name}"
+    return name
+
+
+def get_class_namespace(class_def: ast.ClassDef) -> Optional[str]:
+    """
+    Target namespace recorded in Meta class of generated class
+    """
+    for node in class_def.body:
+        if isinstance(node, ast.ClassDef) and node.name == "Meta":
+            for assignment in node.body:
+                if isinstance(assignment, ast.Assign) and assignment.targets[0].id == "targetNamespace":
+                    return assignment.value.value
+    return None
+
+
+def get_referenced_names(class_def: ast.ClassDef) -> Set[str]:
+    return {node.id for node in ast.walk(class_def) if isinstance(node, ast.Name)}
+
+
+def check_class_name_collision(name: str, namespace: Optional[str], other_namespace: Optional[str]):
+    """
+    Classes refer to each other and are exported by __init__ by name only, so classes of two namespaces
+    with the same name can't be told apart. Class of the same namespace generated again replaces the other one
+    """
+    if namespace != other_namespace:
+        raise ApplicationException(
+            f"Classes of namespaces {other_namespace} and {namespace} are both named {name}, "
+            f"they can't be put into one package"
+        )
+
+
+def get_package_modules(
+    imports: List[ast.stmt],
+    classes: List[Tuple[str, ast.ClassDef]],
+    external_classes: Dict[str, str] = None
+) -> Dict[str, ast.Module]:
+    """
+    Builds modules of package from classes assigned to units. Classes refer to each other at import time
+    (bases, Element types), so units which depend on each other in cycle are merged into one module,
+    named after the first of them.
+
+    :param imports: imports every module needs
+    :param classes: (unit, class definition), classes they depend on go first
+    :param external_classes: name of class defined outside of package -> module it's imported from
+    :return: module name -> module, including __init__
+    """
+    external_classes = external_classes or {}
+    # units are modules before merging cycles, in order of their first class
+    units_order: Dict[str, int] = {}
+    # (class definition, its unit, names of classes it refers to -> their units, external classes it refers to)
+    classes_references = []
+    # class name -> unit of latest class with that name, same as latest definition shadows earlier in one module
+    classes_units: Dict[str, str] = {}
+    classes_namespaces: Dict[str, Optional[str]] = {}
+    for unit, class_def in classes:
+        namespace = get_class_namespace(class_def)
+        if class_def.name in classes_namespaces:
+            check_class_name_collision(class_def.name, namespace, classes_namespaces[class_def.name])
+        classes_namespaces[class_def.name] = namespace
+        units_order.setdefault(unit, len(units_order))
+        names = get_referenced_names(class_def)
+        classes_references.append((
+            class_def,
+            unit,
+            {name: classes_units[name] for name in names if name in classes_units},
+            {name for name in names if name not in classes_units and name in external_classes}
+        ))
+        classes_units[class_def.name] = unit
+
+    units_dependencies: Dict[str, Set[str]] = {unit: set() for unit in units_order}
+    for _, unit, references, _ in classes_references:
+        units_dependencies[unit].update(reference_unit for reference_unit in references.values() if reference_unit != unit)
+
+    units_modules = {}
+    for component in get_strongly_connected_components(units_order, units_dependencies):
+        module_name = min(component, key=units_order.get)
+        for unit in component:
+            units_modules[unit] = module_name
+
+    modules_classes: Dict[str, List[ast.ClassDef]] = {}
+    modules_imports: Dict[str, Dict[str, Set[str]]] = {}
+    modules_external_imports: Dict[str, Dict[str, Set[str]]] = {}
+    classes_modules: Dict[str, str] = {}
+    for class_def, unit, references, external_references in classes_references:
+        module_name = units_modules[unit]
+        modules_classes.setdefault(module_name, []).append(class_def)
+        module_imports = modules_imports.setdefault(module_name, {})
+        for name, reference_unit in references.items():
+            if units_modules[reference_unit] != module_name:
+                module_imports.setdefault(units_modules[reference_unit], set()).add(name)
+        module_external_imports = modules_external_imports.setdefault(module_name, {})
+        for name in external_references:
+            module_external_imports.setdefault(external_classes[name], set()).add(name)
+        classes_modules[class_def.name] = module_name
+
+    modules = {
+        module_name: ast.Module(
+            body=imports + [
+                ast.ImportFrom(module=imported_module, names=[ast.alias(name=name) for name in sorted(names)], level=0)
+                for imported_module, names in sorted(modules_external_imports[module_name].items())
+            ] + [
+                ast.ImportFrom(module=imported_module, names=[ast.alias(name=name) for name in sorted(names)], level=1)
+                for imported_module, names in sorted(modules_imports[module_name].items())
+            ] + class_defs,
+            type_ignores=[]
+        )
+        for module_name, class_defs in modules_classes.items()
+    }
+    modules[INIT_MODULE_NAME] = get_init_module(classes_modules)
+    return modules
+
+
+def get_init_module(classes_modules: Dict[str, str]) -> ast.Module:
+    """
+    __init__ which imports module of class on first access to it
+
+    :param classes_modules: class name -> name of module defining it
+    """
+    lazy_loading = ast.parse(LAZY_LOADING_TEMPLATE).body
+    return ast.Module(
+        body=[node for node in lazy_loading if isinstance(node, ast.Import)] + [
+            ast.Assign(
+                targets=[ast.Name(id="__all__")],
+                value=ast.List(elts=[ast.Constant(value=name) for name in classes_modules]),
+                lineno=0
+            ),
+            ast.Assign(
+                targets=[ast.Name(id="_MODULES")],
+                value=ast.Dict(
+                    keys=[ast.Constant(value=name) for name in classes_modules],
+                    values=[ast.Constant(value=module_name) for module_name in classes_modules.values()]
+                ),
+                lineno=0
+            ),
+        ] + [node for node in lazy_loading if not isinstance(node, ast.Import)],
+        type_ignores=[]
+    )
+
+
+def get_init_module_classes(module: ast.Module) -> List[str]:
+    """
+    Names of classes exported by __init__ written by get_init_module
+    """
+    for node in module.body:
+        if isinstance(node, ast.Assign) and node.targets[0].id == "__all__":
+            return ast.literal_eval(node.value)
+    return []
+
+
+class TypesPackageGenerator:
+    """
+    Splits classes generated by TypesCodeGenerator into package with module per target namespace,
+    or per chunk of chunk_size classes of namespace. Modules which depend on each other in cycle
+    are merged into one, see get_package_modules.
+
+    __init__ imports modules lazily, so importing one class executes only class bodies of its module
+    and of modules it depends on.
+    """
+
+    def __init__(self, types_generator: TypesCodeGenerator, chunk_size: int = None, shared_types: "SharedTypesPackage" = None):
+        """
+        :param shared_types: classes of its namespaces go there instead, modules import them from it
+        """
+        if chunk_size is not None and chunk_size < 1:
+            raise ValueError("chunk_size must be greater or equal 1")
+        self.types_generator = types_generator
+        self.chunk_size = chunk_size
+        self.shared_types = shared_types
+
+    def generate(self) -> Dict[str, ast.Module]:
+        """
+        :return: module name -> module, including __init__
+        """
+        # namespace -> base of its units names, unique as different namespaces can give the same name
+        namespaces_names: Dict[str, str] = {}
+        namespaces_classes_count: Dict[str, int] = {}
+        # (unit, class definition), in generation order
+        classes = []
+
+        def emit(identifier: str, class_def: ast.ClassDef):
+            if self.shared_types is not None and self.shared_types.add_class(identifier, class_def):
+                return
+            namespace = identifier[1:].split("}")[0]
+            if namespace not in namespaces_names:
+                name = get_namespace_module_name(namespace)
+                suffix = 1
+                while name in namespaces_names.values():
+                    suffix += 1
+                    name = f"{get_namespace_module_name(namespace)}_{suffix}"
+                namespaces_names[namespace] = name
+            unit = namespaces_names[namespace]
+            if self.chunk_size is not None:
+                unit = f"{unit}_part{namespaces_classes_count.get(namespace, 0) // self.chunk_size + 1}"
+            namespaces_classes_count[namespace] = namespaces_classes_count.get(namespace, 0) + 1
+            classes.append((unit, class_def))
+
+        self.types_generator.generate_classes(emit)
+        return get_package_modules(
+            self.types_generator.get_imports(),
+            classes,
+            self.shared_types.get_external_classes() if self.shared_types is not None else None
+        )
+
+
+class SharedTypesPackage:
+    """
+    Package with classes of namespaces used by many generated clients (addresses, money types, ...),
+    which all of them import instead of having own copies, so each of those classes is defined once per process.
+
+    Clients put classes of shared namespaces here while they're generated, see add_class. Classes of modules
+    written by earlier runs are kept, so package ends up with classes of all clients using it;
+    class generated again replaces the one with the same name, classes of two namespaces can't share a name.
+    Package has module per namespace, imported lazily.
+    """
+    # class name -> (its namespace, class definition)
+    __classes: Dict[str, Tuple[Optional[str], ast.ClassDef]]
+    # names of classes which stayed in client types
+    __local_classes: Set[str]
+
+    def __init__(self, package_name: str, namespaces: Iterable[str]):
+        """
+        :param package_name: absolute name generated clients import the package with
+        """
+        self.package_name = package_name
+        self.namespaces = set(namespaces)
+        self.__classes = {}
+        self.__local_classes = set()
+
+    def add_class(self, identifier: str, class_def: ast.ClassDef) -> bool:
+        """
+        Takes class if it belongs to one of shared namespaces
+
+        :return: True if class was taken, False if it stays in client types
+        """
+        namespace = identifier[1:].split("}")[0]
+        if namespace not in self.namespaces:
+            self.__local_classes.add(class_def.name)
+            return False
+        if local_references := get_referenced_names(class_def) & self.__local_classes:
+            raise ApplicationException(
+                f"{class_def.name} of shared namespace {namespace} refers to {', '.join(sorted(local_references))}, "
+                f"namespace of those has to be shared too"
+            )
+        if class_def.name in self.__classes:
+            check_class_name_collision(class_def.name, namespace, self.__classes[class_def.name][0])
+        self.__classes.pop(class_def.name, None)
+        self.__classes[class_def.name] = (namespace, class_def)
+        return True
+
+    def add_existing_modules(self, modules: Dict[str, ast.Module]):
+        """
+        Keeps classes of package modules written before, unless a class with the same name was added since
+        """
+        for module_name, module in modules.items():
+            if module_name == INIT_MODULE_NAME:
+                continue
+            for node in module.body:
+                if not isinstance(node, ast.ClassDef):
+                    continue
+                if node.name in self.__classes:
+                    check_class_name_collision(node.name, get_class_namespace(node), self.__classes[node.name][0])
+                else:
+                    self.__classes[node.name] = (get_class_namespace(node), node)
+
+    def get_external_classes(self) -> Dict[str, str]:
+        """
+        :return: name of shared class -> module it's imported from
+        """
+        return {name: self.package_name for name in self.__classes}
+
+    def generate(self, imports: List[ast.stmt]) -> Dict[str, ast.Module]:
+        """
+        :param imports: imports every module needs, see TypesCodeGenerator.get_imports
+        :return: module name -> module, including __init__
+        """
+        # the same namespaces always get the same modules names, no matter in which order clients added them
+        namespaces_names: Dict[Optional[str], str] = {}
+        for namespace in sorted({namespace for namespace, _ in self.__classes.values()}, key=lambda value: value or ""):
+            name = base_name = get_namespace_module_name(namespace or "")
+            suffix = 1
+            while name in namespaces_names.values():
+                suffix += 1
+                name = f"{base_name}_{suffix}"
+            namespaces_names[namespace] = name
+
+        return get_package_modules(
+            imports,
+            [
+                (namespaces_names[self.__classes[name][0]], self.__classes[name][1])
+                for name in self.__get_dependencies_order()
+            ]
+        )
+
+    def __get_dependencies_order(self) -> List[str]:
+        """
+        Names of classes, each one after classes it refers to. Iterative depth-first search, so long chains
+        of base classes don't hit recursion limit
+        """
+        ordered = []
+        visited = set()
+
+        def get_dependencies(name: str) -> Iterable[str]:
+            return (
+                dependency for dependency in sorted(get_referenced_names(self.__classes[name][1]))
+                if dependency in self.__classes and dependency != name
+            )
+
+        for root in self.__classes:
+            if root in visited:
+                continue
+            visited.add(root)
+            stack = [(root, iter(get_dependencies(root)))]
+            while stack:
+                name, dependencies = stack[-1]
+                for dependency in dependencies:
+                    if dependency not in visited:
+                        visited.add(dependency)
+                        stack.append((dependency, iter(get_dependencies(dependency))))
+                        break
+                else:
+                    stack.pop()
+                    ordered.append(name)
+        return ordered
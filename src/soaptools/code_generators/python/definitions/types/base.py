@@ -1,31 +1,45 @@
 import math
-from typing import Dict
+from types import MappingProxyType
+from typing import Mapping
 
 import lxml.etree
 
 from soaptools.code_generators.python.definitions.exceptions import ValidationException
 from soaptools.code_generators.python.definitions.restriction_elements import Enumeration
-from soaptools.helpers.py import chain_hasattr, chain_getattr
+from soaptools.helpers.py import chain_hasattr
 from soaptools.soap.namespaces import XS_NAMESPACE
 
 
 class AnyType:
     """
     Base type for EVERY other type.
+    Every subclass declares __slots__, so its instances have no __dict__
     """
+    __slots__ = ()
     value: object
+    # Meta attributes missing in class, checked once per class instead of on every instantiation
+    _missing_meta: tuple = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._missing_meta = tuple(
+            required_attr for required_attr in ["Meta.name", "Meta.targetNamespace"]
+            if not chain_hasattr(cls, required_attr)
+        )
 
     def __init__(self):
-        for required_attr in ["Meta.name", "Meta.targetNamespace"]:
-            if not chain_hasattr(self, required_attr):
-                raise Exception(f"{required_attr} required")
+        if self._missing_meta:
+            raise Exception(f"{self._missing_meta[0]} required")
 
     class Meta:
         name = "anyType"
         targetNamespace = XS_NAMESPACE
 
     @classmethod
-    def from_lxml_node(cls, node):
+    def from_lxml_node(cls, node, lazy: bool = False):
+        """
+        :param lazy: decode fields on their first read, only complex types have any
+        """
         raise NotImplementedError
 
     def to_lxml(self):
@@ -49,6 +63,12 @@ class AnyType:
 
 
 class SimpleType(AnyType):
+    __slots__ = ("_value",)
+    _restriction = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._restriction = getattr(cls.Meta, "restriction", None)
 
     def __init__(self, value):
         super().__init__()
@@ -57,9 +77,18 @@ class SimpleType(AnyType):
         self.value = value
 
     @classmethod
-    def from_lxml_node(cls, node):
+    def from_lxml_node(cls, node, lazy: bool = False):
         return cls(value=node.text)
 
+    @classmethod
+    def wrap(cls, value):
+        """
+        Instance holding value which was already validated by this type, without validating it again
+        """
+        instance = cls.__new__(cls)
+        instance._value = value
+        return instance
+
     def to_lxml(self):
         raise NotImplementedError
 
@@ -73,8 +102,8 @@ class SimpleType(AnyType):
         self.validate()
 
     def validate(self):
-        if chain_hasattr(self, "Meta.restriction"):
-            self.Meta.restriction.validate(self.value)
+        if self._restriction is not None:
+            self._restriction.validate(self.value)
 
     @property
     def xml_value(self):
@@ -82,10 +111,19 @@ class SimpleType(AnyType):
 
 
 class Element:
+    """
+    Data descriptor of ComplexType field. Value is kept in instance _value under field name as it's returned on read:
+    simple values unwrapped, as python values, complex ones as instances, list of them when max_occurs > 1.
+    Simple values are wrapped in their type again only for serialization. Class attribute access returns Element itself.
+    Field of lazily decoded instance (see ComplexType.from_lxml_node) is decoded from its nodes on first read
+    """
+    name: str = None
+
     def __init__(self, type, default=None, min_occurs=1, max_occurs=1, nillable=False):
         if not issubclass(type, AnyType):
             raise ValueError("type must be AnyType subclass")
         self.type = type
+        self.is_simple = issubclass(type, SimpleType)
 
         self.default = default
 
@@ -108,36 +146,59 @@ class Element:
             raise TypeError("nillable must be bool")
         self.nillable = nillable
 
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        try:
+            return instance._value[self.name]
+        except KeyError:
+            pass
+        if not instance._nodes or self.name not in instance._nodes:
+            raise AttributeError(self.name)
+        self.__store(instance, instance._nodes[self.name], lazy=True)
+        instance._nodes.pop(self.name, None)
+        return instance._value[self.name]
+
+    def __set__(self, instance, value):
+        self.__store(instance, value)
+        if instance._nodes:
+            instance._nodes.pop(self.name, None)
+
+    def __store(self, instance, value, lazy: bool = False):
+        values = self.clean(value, lazy)
+        if self.is_simple:
+            values = [i_value.value for i_value in values]
+        if self.max_occurs > 1:
+            instance._value[self.name] = values
+        else:
+            instance._value[self.name] = values[0] if values else None
 
-class ComplexType(AnyType):
-    def __init__(self, **kwargs):
-        self._value = {}
-        super().__init__()
-        self.Meta.elements_definitions = self._get_elements_definitions()
-
-        for key, element in self.Meta.elements_definitions.items():
-            setattr(self, key, kwargs.get(key))
-
-    def __getattribute__(self, item):
-        old_getter = super().__getattribute__
-        values = old_getter("_value")
-        if values is None:
-            values = {}
-        if item in values:
-            element_definition = self.Meta.elements_definitions[item]
-            values = [i_val.value if issubclass(element_definition.type, SimpleType) else i_val for i_val in
-                      values[item]]
-            if element_definition.max_occurs > 1:
-                return values
-            return values[0] if values else None
-        return old_getter(item)
-
-    def __setattr__(self, key, value):
-        old_setter = super().__setattr__
-        if key not in chain_getattr(self, "Meta.elements_definitions", []):
-            old_setter(key, value)
-            return
+    def get_values(self, value) -> list:
+        """
+        :param value: value of field as kept in instance
+        :return: its values as list, whatever max_occurs is
+        """
+        if self.max_occurs > 1:
+            return value
+        return [] if value is None else [value]
 
+    def wrap(self, value) -> AnyType:
+        """
+        :param value: one of values of field as kept in instance
+        :return: it as instance of type
+        """
+        return self.type.wrap(value) if self.is_simple else value
+
+    def clean(self, value, lazy: bool = False) -> list:
+        """
+        :param value: value or list of values, each instance of type, lxml node, python value of simple type
+            or kwargs of complex type
+        :param lazy: decode lxml nodes of complex type lazily
+        :return: values as instances of type
+        """
         if not isinstance(value, list):
             if value is None:
                 value = []
@@ -145,92 +206,139 @@ class ComplexType(AnyType):
                 value = [value]
 
         cleaned_values = []
-        element_definition = self.Meta.elements_definitions[key]
         for idx, i_value in enumerate(value):
-            if isinstance(i_value, element_definition.type):
+            if isinstance(i_value, self.type):
                 cleaned_values.append(i_value)
             elif isinstance(i_value, AnyType):
                 raise ValidationException({idx: f"Invalid type passed EXPECTED {self.type} FOUND {i_value.__class__}"})
             elif isinstance(i_value, lxml.etree._Element):
-                children = i_value.getchildren()
-                new_value = None
-                if children:
-                    new_value = {}
-                    for child in children:
-                        tag = child.tag.split("}")[-1]
-                        new_value[tag] = new_value.get(tag, []) + [child]
-                elif i_value.text:
-                    new_value = i_value.text  # todo: or it should be "" if None ?
-
-                if new_value is not None:
-                    try:
-                        if issubclass(element_definition.type, ComplexType):
-                            new_value = element_definition.type(**new_value)
-                        else:
-                            new_value = element_definition.type(value=new_value)
-                    except ValidationException as e:
-                        raise ValidationException({key: e.reason})
-
-                    cleaned_values.append(new_value)
-            elif issubclass(element_definition.type, SimpleType):
+                # empty elements are skipped, todo: or it should be "" if None ?
+                try:
+                    if not self.is_simple:
+                        if len(i_value):
+                            cleaned_values.append(self.type.from_lxml_node(i_value, lazy))
+                    elif i_value.text:
+                        cleaned_values.append(self.type(value=i_value.text))
+                except ValidationException as e:
+                    raise ValidationException({self.name: e.reason})
+            elif self.is_simple:
                 try:
-                    cleaned_values.append(element_definition.type(value=i_value))
+                    cleaned_values.append(self.type(value=i_value))
                 except ValidationException as e:
-                    raise ValidationException({key: e.reason})
-            elif issubclass(element_definition.type, ComplexType):
+                    raise ValidationException({self.name: e.reason})
+            elif issubclass(self.type, ComplexType):
                 try:
-                    cleaned_values.append(element_definition.type(**i_value))
+                    cleaned_values.append(self.type(**i_value))
                 except ValidationException as e:
-                    raise ValidationException({key: e.reason})
+                    raise ValidationException({self.name: e.reason})
             else:
                 raise Exception()  # todo
+        return cleaned_values
 
-        self._value[key] = cleaned_values
+
+class ComplexType(AnyType):
+    # _value: field name -> value, _nodes: field name -> lxml nodes of fields not decoded yet, of lazily decoded instance
+    __slots__ = ("_value", "_nodes")
+    # field name -> Element, in order of declaration, fields of base classes first.
+    # Computed once when class is created, read-only, so instances never write class state
+    _elements_definitions: Mapping[str, Element] = MappingProxyType({})
+    # tag of child node, qualified by target namespace or unqualified (local name) -> field name
+    _elements_tags: Mapping[str, str] = MappingProxyType({})
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        elements_definitions = {}
+        for klass in reversed(cls.__mro__):
+            for key, value in vars(klass).items():
+                if isinstance(value, Element):
+                    elements_definitions[key] = value
+                else:
+                    # attribute of subclass overrides element of base class
+                    elements_definitions.pop(key, None)
+        cls._elements_definitions = MappingProxyType(elements_definitions)
+        elements_tags = {name: name for name in elements_definitions}
+        elements_tags.update({f"{{{cls.Meta.targetNamespace}}}{name}": name for name in elements_definitions})
+        cls._elements_tags = MappingProxyType(elements_tags)
+
+    def __init__(self, **kwargs):
+        self._value = {}
+        self._nodes = None
+        super().__init__()
+
+        for key, element in self._elements_definitions.items():
+            element.__set__(self, kwargs.get(key))
 
     def __dir__(self):
-        return self._value.keys()
+        return self._elements_definitions.keys()
+
+    def __getstate__(self):
+        # lxml nodes of lazily decoded instance can't be pickled, so it's decoded whole first
+        self._decode_all()
+        return self._value
+
+    def __setstate__(self, state):
+        self._value = state
+        self._nodes = None
 
     def validate(self):
-        for key, value in self._value:
-            try:
-                value.validate()
-            except ValidationException as e:
-                raise ValidationException(reason={key: e.reason})
+        self._decode_all()
+        for key, element in self._elements_definitions.items():
+            for i_value in element.get_values(self._value[key]):
+                try:
+                    element.wrap(i_value).validate()
+                except ValidationException as e:
+                    raise ValidationException(reason={key: e.reason})
 
     @classmethod
-    def from_lxml_node(cls, node: lxml.etree.Element):
-        elements_defs = cls._get_elements_definitions()
-        kwargs = {
-            element_name: [i_elem for i_elem in node.findall(f"{{{cls.Meta.targetNamespace}}}{element_name}")]
-            for element_name, element_def in elements_defs.items()
-        }
-        return cls(**kwargs)
+    def from_lxml_node(cls, node: lxml.etree.Element, lazy: bool = False):
+        """
+        :param lazy: only group children of node by field, each field is decoded and validated on its first read
+            (and nested complex values lazily too). Instance keeps lxml nodes of fields not read yet
+        """
+        # children are put into their fields in one pass, whatever number of fields is
+        kwargs = {element_name: [] for element_name in cls._elements_definitions}
+        elements_tags = cls._elements_tags
+        for child in node:
+            element_name = elements_tags.get(child.tag)
+            if element_name is None and isinstance(child.tag, str):
+                # element of other namespace, e.g. referenced one
+                element_name = elements_tags.get(child.tag.rpartition("}")[2])
+            if element_name is not None:
+                kwargs[element_name].append(child)
+        if not lazy:
+            return cls(**kwargs)
+        instance = cls.__new__(cls)
+        AnyType.__init__(instance)
+        instance._value = {}
+        instance._nodes = kwargs
+        return instance
+
+    def _decode_all(self):
+        """
+        Decodes fields of lazily decoded instance which weren't read yet
+        """
+        if self._nodes:
+            for element_name in list(self._nodes):
+                getattr(self, element_name)
 
     @property
     def value(self):
+        self._decode_all()
         out = {}
-        for k, values in self._value.items():
-            out_val = [v_elem.value for v_elem in values]
-            if self.Meta.elements_definitions[k].max_occurs == 1:
+        for k, element in self._elements_definitions.items():
+            out_val = [element.wrap(v_elem).value for v_elem in element.get_values(self._value[k])]
+            if element.max_occurs == 1:
                 out_val = out_val[0] if out_val else None
             out[k] = out_val
         return out
 
     @property
     def xml_value(self):
+        self._decode_all()
         out = {}
-        for k, values in self._value.items():
-            out_val = [v_elem.xml_value for v_elem in values]
-            if self.Meta.elements_definitions[k].max_occurs == 1:
+        for k, element in self._elements_definitions.items():
+            out_val = [element.wrap(v_elem).xml_value for v_elem in element.get_values(self._value[k])]
+            if element.max_occurs == 1:
                 out_val = out_val[0] if out_val else None
             out[k] = out_val
         return out
-
-    @classmethod
-    def _get_elements_definitions(cls) -> Dict[str, Element]:
-        if chain_hasattr(cls, "Meta.elements_definitions"):
-            return cls.Meta.elements_definitions
-        return {
-            k: getattr(cls, k)
-            for k in filter(lambda k: isinstance(getattr(cls, k), Element), dir(cls))
-        }
@@ -8,6 +8,7 @@ from soaptools.soap.namespaces import XS_NAMESPACE
 
 
 class AnyUriSimpleType(SimpleType):
+    __slots__ = ()
     # todo: add validation
     class Meta:
         name = "anyURI"
@@ -15,6 +16,7 @@ class AnyUriSimpleType(SimpleType):
 
 
 class Base64BinarySimpleType(SimpleType):
+    __slots__ = ()
     # todo: add validation
     class Meta:
         name = "base64Binary"
@@ -22,6 +24,8 @@ class Base64BinarySimpleType(SimpleType):
 
 
 class BooleanSimpleType(SimpleType):
+    __slots__ = ()
+
     def __init__(self, value):
         if isinstance(value, str) and value in ["true", "false"]:
             value = (value == "true")
@@ -39,6 +43,8 @@ class BooleanSimpleType(SimpleType):
 
 
 class DateSimpleType(SimpleType):
+    __slots__ = ()
+
     def __init__(self, value):
         if isinstance(value, str):
             value = datetime.datetime.strptime(value, "%Y-%m-%d").date()
@@ -58,6 +64,8 @@ class DateSimpleType(SimpleType):
 
 
 class DateTimeSimpleType(SimpleType):
+    __slots__ = ()
+
     def __init__(self, value):
         if isinstance(value, str):
             value = datetime.datetime.fromisoformat(value.replace("Z", ""))
@@ -80,12 +88,14 @@ class DateTimeStampSimpleType(DateTimeSimpleType):
     """
     Like DateTime but explicit timezone info is required
     """
+    __slots__ = ()
     class Meta:
         name = "dateTimeStamp"
         targetNamespace = XS_NAMESPACE
 
 
 class DecimalSimpleType(SimpleType):
+    __slots__ = ()
     values_range = [-math.inf, math.inf]
 
     def __init__(self, value):
@@ -107,6 +117,7 @@ class DecimalSimpleType(SimpleType):
 
 
 class IntegerSimpleType(DecimalSimpleType):
+    __slots__ = ()
 
     class Meta:
         name = "integer"
@@ -114,6 +125,7 @@ class IntegerSimpleType(DecimalSimpleType):
 
 
 class LongSimpleType(IntegerSimpleType):
+    __slots__ = ()
 
     class Meta:
         name = "long"
@@ -121,6 +133,7 @@ class LongSimpleType(IntegerSimpleType):
 
 
 class IntSimpleType(LongSimpleType):
+    __slots__ = ()
     values_range = [-2147483648, 2147483647]
 
     class Meta:
@@ -129,6 +142,7 @@ class IntSimpleType(LongSimpleType):
 
 
 class ShortSimpleType(IntSimpleType):
+    __slots__ = ()
     values_range = [-32768, 32767]
 
     class Meta:
@@ -137,6 +151,7 @@ class ShortSimpleType(IntSimpleType):
 
 
 class ByteSimpleType(ShortSimpleType):
+    __slots__ = ()
     values_range = [-128, 127]
 
     class Meta:
@@ -145,6 +160,7 @@ class ByteSimpleType(ShortSimpleType):
 
 
 class NonNegativeIntegerSimpleType(IntegerSimpleType):
+    __slots__ = ()
     values_range = [0, math.inf]
 
     class Meta:
@@ -153,6 +169,7 @@ class NonNegativeIntegerSimpleType(IntegerSimpleType):
 
 
 class PositiveIntegerSimpleType(NonNegativeIntegerSimpleType):
+    __slots__ = ()
 
     def __init__(self, value):
         super().__init__(value)
@@ -165,30 +182,35 @@ class PositiveIntegerSimpleType(NonNegativeIntegerSimpleType):
 
 
 class UnsignedLongSimpleType(NonNegativeIntegerSimpleType):
+    __slots__ = ()
     class Meta:
         name = "unsignedLong"
         targetNamespace = XS_NAMESPACE
 
 
 class UnsignedIntSimpleType(UnsignedLongSimpleType):
+    __slots__ = ()
     class Meta:
         name = "unsignedInt"
         targetNamespace = XS_NAMESPACE
 
 
 class UnsignedShortSimpleType(UnsignedIntSimpleType):
+    __slots__ = ()
     class Meta:
         name = "unsignedShort"
         targetNamespace = XS_NAMESPACE
 
 
 class UnsignedByteSimpleType(UnsignedShortSimpleType):
+    __slots__ = ()
     class Meta:
         name = "unsignedByte"
         targetNamespace = XS_NAMESPACE
 
 
 class NonPositiveIntegerSimpleType(IntegerSimpleType):
+    __slots__ = ()
     values_range = [-math.inf, 0]
 
     class Meta:
@@ -197,6 +219,7 @@ class NonPositiveIntegerSimpleType(IntegerSimpleType):
 
 
 class NegativeIntegerSimpleType(NonPositiveIntegerSimpleType):
+    __slots__ = ()
 
     def __init__(self, value):
         super().__init__(value)
@@ -209,12 +232,14 @@ class NegativeIntegerSimpleType(NonPositiveIntegerSimpleType):
 
 
 class DoubleSimpleType(SimpleType):
+    __slots__ = ()
     class Meta:
         name = "double"
         targetNamespace = XS_NAMESPACE
 
 
 class DurationSimpleType(SimpleType):
+    __slots__ = ()
 
     def __init__(self, value):
         # options: datetime.timedelta, string, own implementation
@@ -237,18 +262,22 @@ class DurationSimpleType(SimpleType):
 
 
 class DayTimeDurationSimpleType(SimpleType):
+    __slots__ = ()
     class Meta:
         name = "dayTimeDuration"
         targetNamespace = XS_NAMESPACE
 
 
 class YearMonthDurationSimpleType(SimpleType):
+    __slots__ = ()
     class Meta:
         name = "yearMonthDuration"
         targetNamespace = XS_NAMESPACE
 
 
 class FloatSimpleType(SimpleType):
+    __slots__ = ()
+
     def __init__(self, value):
         if isinstance(value, str):
             value = float(value)
@@ -262,54 +291,64 @@ class FloatSimpleType(SimpleType):
 
 
 class GDaySimpleType(SimpleType):
+    __slots__ = ()
     class Meta:
         name = "gDay"
         targetNamespace = XS_NAMESPACE
 
 
 class GMonthSimpleType(SimpleType):
+    __slots__ = ()
     class Meta:
         name = "gMonth"
         targetNamespace = XS_NAMESPACE
 
 
 class GMonthDaySimpleType(SimpleType):
+    __slots__ = ()
     class Meta:
         name = "gMonthDay"
         targetNamespace = XS_NAMESPACE
 
 
 class GYearSimpleType(SimpleType):
+    __slots__ = ()
     class Meta:
         name = "gYear"
         targetNamespace = XS_NAMESPACE
 
 
 class GYearMonthSimpleType(SimpleType):
+    __slots__ = ()
     class Meta:
         name = "gYearMonth"
         targetNamespace = XS_NAMESPACE
 
 
 class HexBinarySimpleType(SimpleType):
+    __slots__ = ()
     class Meta:
         name = "hexBinary"
         targetNamespace = XS_NAMESPACE
 
 
 class NotationSimpleType(SimpleType):
+    __slots__ = ()
     class Meta:
         name = "NOTATION"
         targetNamespace = XS_NAMESPACE
 
 
 class QNameSimpleType(SimpleType):
+    __slots__ = ()
     class Meta:
         name = "QName"
         targetNamespace = XS_NAMESPACE
 
 
 class StringSimpleType(SimpleType):
+    __slots__ = ()
+
     def __init__(self, value):
         if not isinstance(value, str):
             raise ValidationException("value must be string instance")
@@ -321,60 +360,70 @@ class StringSimpleType(SimpleType):
 
 
 class NormalizedStringSimpleType(SimpleType):
+    __slots__ = ()
     class Meta:
         name = "normalizedString"
         targetNamespace = XS_NAMESPACE
 
 
 class TokenSimpleType(NormalizedStringSimpleType):
+    __slots__ = ()
     class Meta:
         name = "token"
         targetNamespace = XS_NAMESPACE
 
 
 class LanguageSimpleType(TokenSimpleType):
+    __slots__ = ()
     class Meta:
         name = "language"
         targetNamespace = XS_NAMESPACE
 
 
 class NameSimpleType(TokenSimpleType):
+    __slots__ = ()
     class Meta:
         name = "Name"
         targetNamespace = XS_NAMESPACE
 
 
 class NCNameSimpleType(TokenSimpleType):
+    __slots__ = ()
     class Meta:
         name = "NCName"
         targetNamespace = XS_NAMESPACE
 
 
 class EntitySimpleType(NCNameSimpleType):
+    __slots__ = ()
     class Meta:
         name = "ENTITY"
         targetNamespace = XS_NAMESPACE
 
 
 class IdSimpleType(NCNameSimpleType):
+    __slots__ = ()
     class Meta:
         name = "ID"
         targetNamespace = XS_NAMESPACE
 
 
 class IdRefSimpleType(NCNameSimpleType):
+    __slots__ = ()
     class Meta:
         name = "IDREF"
         targetNamespace = XS_NAMESPACE
 
 
 class NmTokenSimpleType(TokenSimpleType):
+    __slots__ = ()
     class Meta:
         name = "NMTOKEN"
         targetNamespace = XS_NAMESPACE
 
 
 class TimeSimpleType(SimpleType):
+    __slots__ = ()
     class Meta:
         name = "time"
         targetNamespace = XS_NAMESPACE
@@ -0,0 +1,206 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Optional, Tuple
+
+import requests
+
+from soaptools.exceptions import ApplicationException
+from soaptools.helpers.py import Logger, HTTP_TIMEOUT, CHUNK_SIZE
+
+DEFAULT_CACHE_DIRECTORY = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "soaptools"
+)
+DEFAULT_TTL = 0
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+
+
+class DocumentCache:
+    """
+    Persistent cache of remote documents.
+
+    Bodies are stored content-addressed (by sha256) in objects/, so identical documents served
+    under different URLs are stored once. Every URL has its entry in index/ holding ETag,
+    Last-Modified and fetch time, used to revalidate stale entries with conditional requests.
+
+    ttl: seconds during which entry is reused without contacting server
+    max_size: bytes, when exceeded least recently used entries are evicted
+    offline: never touch network, fail if document isn't cached
+    """
+
+    def __init__(
+        self,
+        directory: str = DEFAULT_CACHE_DIRECTORY,
+        ttl: float = DEFAULT_TTL,
+        max_size: int = DEFAULT_MAX_SIZE,
+        offline: bool = False,
+    ):
+        if ttl < 0:
+            raise ValueError("ttl must be greater or equal 0")
+        if max_size < 0:
+            raise ValueError("max_size must be greater or equal 0")
+        self.directory = directory
+        self.ttl = ttl
+        self.max_size = max_size
+        self.offline = offline
+        os.makedirs(self.__index_directory, exist_ok=True)
+        os.makedirs(self.__objects_directory, exist_ok=True)
+
+    def get_file(self, url: str, session: requests.Session = None) -> Tuple[str, str]:
+        """
+        Returns path of cached file holding document body and its sha256
+        """
+        entry = self.__read_entry(url)
+        if entry is not None and not os.path.isfile(self.__object_path(entry["digest"])):
+            entry = None
+
+        if self.offline:
+            if entry is None:
+                raise self.NotCachedException(f"{url} is not cached and offline mode is on")
+            return self.__use_entry(url, entry)
+
+        if entry is not None and time.time() - entry["fetched_at"] < self.ttl:
+            return self.__use_entry(url, entry)
+
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            response = self.__request(url, session, headers)
+        except requests.RequestException as e:
+            if entry is None:
+                raise
+            Logger.warning(f"Revalidation of {url} failed ({e}), using cached copy")
+            return self.__use_entry(url, entry)
+
+        with response:
+            if response.status_code != 304:
+                return self.__store(url, response)
+            if entry is not None:
+                entry["fetched_at"] = time.time()
+                self.__write_entry(url, entry)
+                return self.__use_entry(url, entry)
+
+        # 304 without entry, e.g. proxy remembering validator of lost one: its empty body isn't the document
+        Logger.warning(f"{url} answered 304 Not Modified to request without validators, fetching it again")
+        with self.__request(url, session, {"Cache-Control": "no-cache"}) as response:
+            if response.status_code == 304:
+                raise ApplicationException(f"{url} answered 304 Not Modified to request without validators")
+            return self.__store(url, response)
+
+    def get(self, url: str, session: requests.Session = None) -> bytes:
+        path, _ = self.get_file(url, session)
+        with open(path, mode="rb") as file:
+            return file.read()
+
+    def clear(self):
+        for directory in [self.__index_directory, self.__objects_directory]:
+            for file_name in os.listdir(directory):
+                os.remove(os.path.join(directory, file_name))
+
+    @staticmethod
+    def __request(url: str, session: Optional[requests.Session], headers: dict) -> requests.Response:
+        """
+        Streamed GET, raising for error statuses. 304 Not Modified is returned as is
+        """
+        response = (session or requests).get(url, headers=headers, timeout=HTTP_TIMEOUT, stream=True)
+        if response.status_code != 304:
+            response.raise_for_status()
+        return response
+
+    def __store(self, url: str, response: requests.Response) -> Tuple[str, str]:
+        # body is streamed to disk, it's never held in memory as a whole
+        sha256 = hashlib.sha256()
+        size = 0
+        temporary_path = os.path.join(self.__objects_directory, f"{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(temporary_path, mode="wb") as file:
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                sha256.update(chunk)
+                size += len(chunk)
+                file.write(chunk)
+        digest = sha256.hexdigest()
+        os.replace(temporary_path, self.__object_path(digest))
+
+        self.__write_entry(url, {
+            "url": url,
+            "digest": digest,
+            "size": size,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+        })
+        self.__evict(keep_entry_path=self.__entry_path(url))
+        return self.__object_path(digest), digest
+
+    def __use_entry(self, url: str, entry: dict) -> Tuple[str, str]:
+        # access time of entry is used for LRU eviction
+        os.utime(self.__entry_path(url))
+        return self.__object_path(entry["digest"]), entry["digest"]
+
+    def __evict(self, keep_entry_path: str):
+        entries = []
+        for file_name in os.listdir(self.__index_directory):
+            entry_path = os.path.join(self.__index_directory, file_name)
+            try:
+                with open(entry_path) as file:
+                    entries.append((os.path.getmtime(entry_path), entry_path, json.load(file)))
+            except (OSError, ValueError):
+                continue
+
+        sizes = {entry["digest"]: entry["size"] for _, _, entry in entries}
+        total_size = sum(sizes.values())
+        references = {}
+        for _, _, entry in entries:
+            references[entry["digest"]] = references.get(entry["digest"], 0) + 1
+
+        for _, entry_path, entry in sorted(entries, key=lambda item: item[0]):
+            if total_size <= self.max_size:
+                break
+            if entry_path == keep_entry_path:
+                continue
+            os.remove(entry_path)
+            references[entry["digest"]] -= 1
+            if references[entry["digest"]] == 0:
+                total_size -= sizes[entry["digest"]]
+                try:
+                    os.remove(self.__object_path(entry["digest"]))
+                except FileNotFoundError:
+                    pass
+
+    def __read_entry(self, url: str) -> Optional[dict]:
+        try:
+            with open(self.__entry_path(url)) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def __write_entry(self, url: str, entry: dict):
+        entry_path = self.__entry_path(url)
+        temporary_path = f"{entry_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary_path, mode="w") as file:
+            json.dump(entry, file)
+        os.replace(temporary_path, entry_path)
+
+    def __entry_path(self, url: str) -> str:
+        return os.path.join(self.__index_directory, hashlib.sha256(url.encode()).hexdigest() + ".json")
+
+    def __object_path(self, digest: str) -> str:
+        return os.path.join(self.__objects_directory, digest)
+
+    @property
+    def __index_directory(self) -> str:
+        return os.path.join(self.directory, "index")
+
+    @property
+    def __objects_directory(self) -> str:
+        return os.path.join(self.directory, "objects")
+
+    class NotCachedException(ApplicationException):
+        pass
@@ -1,10 +1,82 @@
-from typing import Dict
+import sys
+from typing import Dict, FrozenSet, Tuple
+
+import lxml.etree
+
 
 def get_full_identifier(val: str, nsmap: Dict[str, str]) -> str:
+    """
+    Resolves QName to {namespace}name. Result is interned, as the same QNames repeat all over parsed model.
+    """
     if ":" in val:
         ns_prefix, node_name = val.split(":")
         val = "{%s}%s" % (nsmap[ns_prefix], node_name)
-    return val
+    return sys.intern(val)
+
+
+class QNameResolver:
+    """
+    Resolves QNames with results cached per in-scope namespace map.
+
+    lxml builds `node.nsmap` from scratch on every access, walking up all ancestors,
+    so it is read once per scope (top-level schema node) and reused for all of its descendants.
+    Scope whose descendants declare namespaces themselves (which can redeclare prefix) resolves every QName
+    with nsmap of its node instead.
+    """
+    __resolved: Dict[FrozenSet[Tuple[str, str]], Dict[str, str]]
+    # root of document -> whether any node below it declares namespace
+    __nested_declarations: Dict[lxml.etree._Element, bool]
+
+    def __init__(self):
+        self.__resolved = {}
+        self.__nested_declarations = {}
+
+    def get_scope(self, node: lxml.etree._Element, whole_document: bool = True) -> "QNameResolver.Scope":
+        """
+        :param whole_document: node is part of complete document, which is checked for namespace declarations once,
+            so nodes of documents declaring namespaces only on root aren't walked one by one. Not for streamed nodes
+        """
+        nsmap = node.nsmap
+        resolved = self.__resolved.setdefault(frozenset(nsmap.items()), {})
+        nested_declarations = True
+        if whole_document:
+            root = node.getroottree().getroot()
+            if (nested_declarations := self.__nested_declarations.get(root)) is None:
+                nested_declarations = self.__nested_declarations[root] = self.has_nested_declarations(root)
+        return self.Scope(nsmap, resolved, nested_declarations and self.has_nested_declarations(node))
+
+    @staticmethod
+    def has_nested_declarations(node: lxml.etree._Element) -> bool:
+        """
+        Whether some descendant of node declares namespace. Walk is done in C, only start of node itself
+        (and of descendants with the same tag) and namespace declarations come to python
+        """
+        started = False
+        for event, _ in lxml.etree.iterwalk(node, events=("start", "start-ns"), tag=node.tag):
+            if event == "start":
+                started = True
+            elif started:
+                return True
+        return False
+
+    class Scope:
+        __slots__ = ("nsmap", "resolved", "nested_declarations")
+
+        def __init__(self, nsmap: Dict[str, str], resolved: Dict[str, str], nested_declarations: bool = False):
+            self.nsmap = nsmap
+            self.resolved = resolved
+            self.nested_declarations = nested_declarations
+
+        def resolve(self, val: str, node: lxml.etree._Element) -> str:
+            """
+            :param node: node holding QName, its nsmap is read only if some node of scope declares namespaces
+            """
+            if self.nested_declarations:
+                return get_full_identifier(val, node.nsmap)
+            if (full_identifier := self.resolved.get(val)) is not None:
+                return full_identifier
+            full_identifier = self.resolved[val] = get_full_identifier(val, self.nsmap)
+            return full_identifier
 
 
 def xml_val_to_python_val(val: str):
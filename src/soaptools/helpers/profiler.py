@@ -0,0 +1,117 @@
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+
+def get_cpu_time() -> float:
+    """
+    User and system time of process and of its finished child processes, e.g. formatting pool
+    """
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+class Profiler:
+    """
+    Records wall time, CPU time and peak of memory allocated by python (tracemalloc) of named phases of run,
+    and counters, e.g. number of fetched documents. Phase entered many times accumulates.
+    Time of phase nested in another one is counted only for the nested one, so e.g. fetching of imported schemas
+    isn't counted in parsing which triggered it. Peak memory of phase includes phases nested in it.
+
+    CPU time and memory are of whole process, so they're exact only when one run is profiled at a time
+    (generate-batch doesn't allow --profile in its jobs).
+    Phases running concurrently in threads (fetching) overlap, their wall times can add up to more than total.
+    Disabled profiler records nothing.
+    """
+    __phases: Dict[str, Dict[str, float]]
+    counters: Dict[str, int]
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.__phases = {}
+        self.counters = {}
+        self.__lock = threading.Lock()
+        # per thread stack of entered phases: [name, wall time at start, cpu time at start,
+        # wall time of nested phases, cpu time of nested phases, peak memory so far]
+        self.__local = threading.local()
+        self.__start = None
+        # tracing is stopped only by profiler which started it, not in middle of someone else's
+        self.__started_tracing = False
+
+    def start(self):
+        if not self.enabled:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.__started_tracing = True
+        tracemalloc.reset_peak()
+        self.__start = (time.perf_counter(), get_cpu_time())
+
+    def stop(self) -> Dict:
+        """
+        :return: report, see get_report
+        """
+        report = self.get_report()
+        if self.__started_tracing:
+            tracemalloc.stop()
+            self.__started_tracing = False
+        return report
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        stack: List[list] = self.__local.__dict__.setdefault("stack", [])
+        peak = tracemalloc.get_traced_memory()[1]
+        for frame in stack:
+            frame[5] = max(frame[5], peak)
+        tracemalloc.reset_peak()
+        frame = [name, time.perf_counter(), get_cpu_time(), 0.0, 0.0, 0]
+        stack.append(frame)
+        try:
+            yield
+        finally:
+            stack.pop()
+            wall_time = time.perf_counter() - frame[1]
+            cpu_time = get_cpu_time() - frame[2]
+            peak = max(frame[5], tracemalloc.get_traced_memory()[1])
+            if stack:
+                stack[-1][3] += wall_time
+                stack[-1][4] += cpu_time
+                stack[-1][5] = max(stack[-1][5], peak)
+            with self.__lock:
+                phase = self.__phases.setdefault(name, {"calls": 0, "wall_time": 0.0, "cpu_time": 0.0, "peak_memory": 0})
+                phase["calls"] += 1
+                phase["wall_time"] += wall_time - frame[3]
+                phase["cpu_time"] += cpu_time - frame[4]
+                phase["peak_memory"] = max(phase["peak_memory"], peak)
+
+    def count(self, name: str, value: int = 1):
+        if not self.enabled:
+            return
+        with self.__lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def get_report(self) -> Dict:
+        """
+        Times in seconds, memory in bytes:
+        {"total": {"wall_time", "cpu_time", "peak_memory"}, "phases": {name: {"calls", "wall_time", "cpu_time",
+        "peak_memory"}}, "counters": {name: value}}
+        """
+        with self.__lock:
+            phases = {name: dict(phase) for name, phase in self.__phases.items()}
+            counters = dict(self.counters)
+        total = {"wall_time": 0.0, "cpu_time": 0.0, "peak_memory": 0}
+        if self.__start is not None:
+            total = {
+                "wall_time": time.perf_counter() - self.__start[0],
+                "cpu_time": get_cpu_time() - self.__start[1],
+                "peak_memory": max(
+                    [phase["peak_memory"] for phase in phases.values()] + [tracemalloc.get_traced_memory()[1]]
+                ),
+            }
+        return {"total": total, "phases": phases, "counters": counters}
@@ -1,17 +1,54 @@
 import hashlib
 import os
 import re
-import random
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, Iterable, List, Set
+from urllib.parse import urljoin
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from soaptools.helpers.validators import is_url
 
+HTTP_TIMEOUT = 30
+CHUNK_SIZE = 64 * 1024
+
 
 def find_by_predicate(iterable, predicate):
     return next((element for element in iterable if predicate(element) is True), None)
 
 
+def intern(value):
+    """
+    sys.intern which passes through None and non-string values
+    """
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class Immutable:
+    """
+    Base for slotted objects which can't be modified after construction.
+    Subclasses set attributes with object.__setattr__ in constructor and list constructor
+    arguments, in order, in _fields - it's used for pickling, copying and repr.
+    """
+    __slots__ = ()
+    _fields = ()
+
+    def __setattr__(self, key, value):
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    def __delattr__(self, item):
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    def __reduce__(self):
+        return self.__class__, tuple(getattr(self, field) for field in self._fields)
+
+    def __repr__(self):
+        fields = ", ".join(f"{field}={getattr(self, field)!r}" for field in self._fields)
+        return f"{self.__class__.__name__}({fields})"
+
+
 def chain_hasattr(obj, path):
     current = obj
     for subelement in path.split("."):
@@ -32,23 +69,116 @@ def chain_getattr(obj, path, default="totally_default"):
     return current
 
 
-def get_content_from_uri(uri: str) -> str:
-    if is_url(uri):
-        return requests.get(uri).text
-    elif os.path.isfile(uri):
-        return open(uri, encoding="utf-8").read()
-    raise Exception(f"{uri} is not valid URL nor filesystem path")
+def create_http_session(pool_size: int = 10) -> requests.Session:
+    """
+    Keep-alive session holding up to pool_size connections per host,
+    so concurrent downloads from the same host reuse their connections
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def resolve_location(location: str, base: str = None) -> str:
+    """
+    Absolute URL or filesystem path of location.
+    Relative location is resolved against location of document it comes from (base), if known.
+    """
+    if is_url(location):
+        return location
+    if base and is_url(base):
+        return urljoin(base, location)
+    if base:
+        location = os.path.join(os.path.dirname(base), location)
+    return os.path.abspath(location)
+
+
+def get_file_digest(path: str) -> str:
+    sha256 = hashlib.sha256()
+    with open(path, mode="rb") as file:
+        while chunk := file.read(CHUNK_SIZE):
+            sha256.update(chunk)
+    return sha256.hexdigest()
 
 
 def format_code(code: str) -> str:
-    rand_file_name = hashlib.sha1(random.randbytes(10)).hexdigest() + ".py"
-    open(rand_file_name, mode="w").write(code)
+    """
+    Formats code with black, in-process. Code which black can't handle is returned unformatted
+    """
+    # imported here, black is slow to import and isn't needed when formatting is turned off
+    import black
+    try:
+        return black.format_str(code, mode=black.Mode())
+    except Exception as e:
+        Logger.warning(f"Generated code couldn't be formatted: {e}")
+        return code
 
-    os.system(f"black {rand_file_name}")
-    formatted_code = open(rand_file_name).read()
-    os.remove(rand_file_name)
 
-    return formatted_code
+def format_modules(modules: Dict[str, str], max_workers: int = None, executor: Executor = None) -> Dict[str, str]:
+    """
+    Formats code of independent modules, spread across process pool if there is more than one
+
+    :param modules: module name -> code
+    :param max_workers: processes count, number of CPUs by default
+    :param executor: process pool shared with other callers, used instead of a new one
+    """
+    if executor is not None:
+        return dict(zip(modules.keys(), executor.map(format_code, modules.values())))
+    if len(modules) <= 1 or max_workers == 1:
+        return {name: format_code(code) for name, code in modules.items()}
+
+    with ProcessPoolExecutor(max_workers=min(len(modules), max_workers or os.cpu_count() or 1)) as executor:
+        return dict(zip(modules.keys(), executor.map(format_code, modules.values())))
+
+
+def get_strongly_connected_components(nodes: Iterable[str], edges: Dict[str, Set[str]]) -> List[List[str]]:
+    """
+    Tarjan's algorithm, iterative so deep graphs don't hit recursion limit.
+    Components are returned in reverse topological order: every component goes after components it has edges to.
+
+    :param edges: node -> nodes it has edges to
+    """
+    index = {}
+    lowlink = {}
+    stack = []
+    on_stack = set()
+    components = []
+
+    for root in nodes:
+        if root in index:
+            continue
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(sorted(edges.get(root, ()))))]
+        while work:
+            node, successors = work[-1]
+            for successor in successors:
+                if successor not in index:
+                    index[successor] = lowlink[successor] = len(index)
+                    stack.append(successor)
+                    on_stack.add(successor)
+                    work.append((successor, iter(sorted(edges.get(successor, ())))))
+                    break
+                if successor in on_stack:
+                    lowlink[node] = min(lowlink[node], index[successor])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+    return components
 
 
 def do_math_operation(obj1, obj2, operation):
@@ -0,0 +1,61 @@
+import hashlib
+import os
+import pickle
+import threading
+from typing import Dict, Optional, Tuple
+
+import soaptools
+from soaptools.helpers.cache import DEFAULT_CACHE_DIRECTORY
+from soaptools.soap.loader import DocumentLoader
+
+DEFAULT_DECLARATIONS_CACHE_DIRECTORY = os.path.join(DEFAULT_CACHE_DIRECTORY, "declarations")
+
+# bump when declarations classes change in a way that breaks unpickling of older files
+CACHE_FORMAT_VERSION = 3
+
+
+class DeclarationCache:
+    """
+    Stores parsed declarations models (WsdlDeclaration, list of TypeDeclaration) between runs.
+
+    Every file starts with a header holding sha256 of each source document the model was built from.
+    Model is loaded only when all of those documents still have the same digests,
+    so lxml parsing and schema walk are skipped entirely for unchanged inputs.
+    """
+
+    def __init__(self, directory: str = DEFAULT_DECLARATIONS_CACHE_DIRECTORY):
+        self.directory = directory
+        os.makedirs(self.directory, exist_ok=True)
+
+    def get(self, key: str, loader: DocumentLoader) -> Optional[Tuple[object, Dict[str, str]]]:
+        """
+        :return: model and digests of its sources, if it's cached and sources didn't change
+        """
+        try:
+            with open(self.__path(key), mode="rb") as file:
+                header = pickle.load(file)
+                if header.get("format") != CACHE_FORMAT_VERSION or header.get("version") != soaptools.__version__:
+                    return None
+                for location, digest in header["sources"].items():
+                    if loader.get_digest(location) != digest:
+                        return None
+                return pickle.load(file), header["sources"]
+        except Exception:
+            # missing or unreadable file, incompatible model or source which can't be fetched anymore
+            return None
+
+    def set(self, key: str, model: object, sources: Dict[str, str]):
+        header = {
+            "format": CACHE_FORMAT_VERSION,
+            "version": soaptools.__version__,
+            "sources": sources,
+        }
+        path = self.__path(key)
+        temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary_path, mode="wb") as file:
+            pickle.dump(header, file, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(model, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, path)
+
+    def __path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest() + ".pickle")
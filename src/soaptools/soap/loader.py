@@ -0,0 +1,229 @@
+import hashlib
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Dict, Iterable, Iterator, Set, Tuple, Union
+
+import lxml.etree
+
+from soaptools.helpers.cache import DocumentCache
+from soaptools.helpers.profiler import Profiler
+from soaptools.helpers.py import create_http_session, resolve_location, get_file_digest, HTTP_TIMEOUT
+from soaptools.helpers.validators import is_url
+from soaptools.soap.namespaces import XS_NAMESPACE
+
+DEFAULT_MAX_WORKERS = 8
+
+
+def get_schema_references(schema: lxml.etree._Element, known_namespaces: Set[str]) -> Iterator[str]:
+    """
+    Yields resolved schemaLocation of every <xs:import/> and <xs:include/> of schema.
+    Imports of namespaces from known_namespaces are skipped, same as SchemaParser does.
+    """
+    for node in schema.iterchildren(f"{{{XS_NAMESPACE}}}import", f"{{{XS_NAMESPACE}}}include"):
+        if node.tag == f"{{{XS_NAMESPACE}}}import" and node.attrib.get("namespace") in known_namespaces:
+            continue
+        if schema_location := node.attrib.get("schemaLocation"):
+            yield resolve_location(schema_location, node.base)
+
+
+class DocumentLoader:
+    """
+    Fetches and parses WSDL/XSD documents. Every parsed document is kept in memory, keyed by
+    its absolute location, so each document is downloaded and parsed once per run,
+    over one keep-alive HTTP session. Remote documents go through cache, if passed.
+
+    Documents are parsed with their location as base URL, so relative schemaLocation
+    can be resolved against node.base.
+
+    Documents are never decoded in python. Files (local or cached) are parsed by lxml straight
+    from their path, not cached remote documents from response bytes, so parser
+    sees original bytes and honours encoding from XML declaration.
+
+    huge_tree: lift libxml2 limits of tree depth and text nodes size, for very large documents
+    profiler: records "fetch" phase and counts fetched documents and their bytes
+
+    Loader can be shared by threads, e.g. generating several services at once:
+    each document is still fetched and parsed by one of them only, and declaration of each top-level
+    schema definition is built once, see get_definition.
+    """
+    documents: Dict[str, lxml.etree._Element]
+    digests: Dict[str, str]
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        cache: DocumentCache = None,
+        huge_tree: bool = False,
+        profiler: Profiler = None
+    ):
+        if max_workers < 1:
+            raise ValueError("max_workers must be greater or equal 1")
+        self.max_workers = max_workers
+        self.cache = cache
+        self.huge_tree = huge_tree
+        self.profiler = profiler or Profiler(enabled=False)
+        self.documents = {}
+        self.digests = {}
+        # sources of documents which weren't loaded, as their declarations came from cache
+        self.__known_sources = {}
+        # fetched, but not parsed yet documents: filesystem path or content
+        self.__unparsed_sources = {}
+        self.__locations_locks: Dict[str, threading.Lock] = {}
+        self.__locations_locks_lock = threading.Lock()
+        # (top-level schema definition node, its target namespace) -> its declaration
+        self.__definitions: Dict[Tuple[lxml.etree._Element, str], object] = {}
+        self.session = create_http_session(pool_size=max_workers)
+
+    def load(self, location: str, base: str = None) -> lxml.etree._Element:
+        """
+        :param base: location of document which refers to loaded one
+        """
+        location = resolve_location(location, base)
+        if (document := self.documents.get(location)) is not None:
+            return document
+        with self.__get_location_lock(location):
+            if location not in self.documents:
+                if (source := self.__unparsed_sources.pop(location, None)) is None:
+                    source = self.__fetch(location)
+                self.documents[location] = self.__parse(source, location)
+        return self.documents[location]
+
+    def iterparse(self, location: str, base: str = None) -> Iterator[Tuple[str, lxml.etree._Element]]:
+        """
+        Parses document incrementally, yielding ("start", node) and ("end", node) events.
+        Document is not kept in memory, caller is expected to clear nodes it is done with.
+        Comments and processing instructions are dropped.
+        """
+        location = resolve_location(location, base)
+        with self.__get_location_lock(location):
+            source = self.__unparsed_sources.pop(location, None) or self.__fetch(location)
+        if isinstance(source, bytes):
+            source = io.BytesIO(source)
+        return lxml.etree.iterparse(
+            source,
+            events=("start", "end"),
+            huge_tree=self.huge_tree,
+            remove_comments=True,
+            remove_pis=True
+        )
+
+    def get_digest(self, location: str) -> str:
+        """
+        sha256 of document content. Document is fetched if needed, but not parsed.
+        """
+        location = resolve_location(location)
+        with self.__get_location_lock(location):
+            if location not in self.digests:
+                self.__unparsed_sources[location] = self.__fetch(location)
+        return self.digests[location]
+
+    def get_sources(self, location: str) -> Dict[str, str]:
+        """
+        Digests of loaded document and of every loaded document it imports or includes, transitively.
+        For document which wasn't loaded, sources set with set_sources are returned
+        """
+        if (known_sources := self.__known_sources.get(resolve_location(location))) is not None:
+            return dict(known_sources)
+        sources = {}
+        to_visit = [resolve_location(location)]
+        while to_visit:
+            location = to_visit.pop()
+            if location in sources or location not in self.documents:
+                continue
+            sources[location] = self.digests[location]
+            for schema in self.documents[location].iter(f"{{{XS_NAMESPACE}}}schema"):
+                to_visit.extend(get_schema_references(schema, set()))
+        return sources
+
+    def set_sources(self, location: str, sources: Dict[str, str]):
+        """
+        Records sources of document without loading it, e.g. when its declarations are taken from cache
+        """
+        self.__known_sources[resolve_location(location)] = dict(sources)
+
+    def get_definition(self, node: lxml.etree._Element, target_namespace: str, parse: Callable[[], object]) -> object:
+        """
+        Declaration of top-level definition of loaded schema, built with parse on first request only.
+        Documents are kept, so parsers sharing loader (jobs of generate-batch) share declarations of schemas
+        they have in common too. Key holds node, so lxml keeps returning the same proxy object for it
+        """
+        key = (node, target_namespace)
+        if (definition := self.__definitions.get(key)) is None:
+            # built twice at worst, when requested by two threads at once, the first one is kept
+            definition = self.__definitions.setdefault(key, parse())
+        return definition
+
+    def prefetch_schemas(self, schemas: Iterable[lxml.etree._Element]):
+        """
+        Walks <xs:import/> and <xs:include/> graph of passed schemas and loads every
+        referenced document using at most max_workers concurrent requests.
+        Documents are loaded by workers with load, so document prefetched or loaded by other thread
+        at the same time is still fetched and parsed once. References of each document are requested
+        as soon as it's parsed.
+        Failed downloads are ignored here, they are reported by SchemaParser when it reaches them.
+        """
+        schemas = list(schemas)
+        known_namespaces = {schema.attrib.get("targetNamespace") for schema in schemas}
+        requested_locations = set()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = set()
+
+            def request_references(schema: lxml.etree._Element):
+                for location in get_schema_references(schema, known_namespaces):
+                    if location not in requested_locations:
+                        requested_locations.add(location)
+                        pending.add(executor.submit(self.load, location))
+
+            for schema in schemas:
+                request_references(schema)
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pending.remove(future)
+                    try:
+                        document = future.result()
+                    except Exception:
+                        continue
+                    request_references(document)
+
+    def __get_location_lock(self, location: str) -> threading.Lock:
+        """
+        Lock held while document is fetched or parsed, so other threads wait for it instead of fetching it again
+        """
+        with self.__locations_locks_lock:
+            return self.__locations_locks.setdefault(location, threading.Lock())
+
+    def __fetch(self, location: str) -> Union[str, bytes]:
+        """
+        Makes document available locally and records its digest.
+        Returns filesystem path of document (its own or cached copy) or, if not cached, its content
+        """
+        with self.profiler.phase("fetch"):
+            source = self.__fetch_source(location)
+        if self.profiler.enabled:
+            self.profiler.count("documents")
+            self.profiler.count("bytes", len(source) if isinstance(source, bytes) else os.path.getsize(source))
+        return source
+
+    def __fetch_source(self, location: str) -> Union[str, bytes]:
+        if not is_url(location):
+            self.digests[location] = get_file_digest(location)
+            return location
+        if self.cache is not None:
+            path, self.digests[location] = self.cache.get_file(location, self.session)
+            return path
+
+        response = self.session.get(location, timeout=HTTP_TIMEOUT)
+        response.raise_for_status()
+        self.digests[location] = hashlib.sha256(response.content).hexdigest()
+        return response.content
+
+    def __parse(self, source: Union[str, bytes], location: str) -> lxml.etree._Element:
+        parser = lxml.etree.XMLParser(huge_tree=self.huge_tree)
+        if isinstance(source, bytes):
+            return lxml.etree.fromstring(source, parser, base_url=location)
+        return lxml.etree.parse(source, parser, base_url=location).getroot()
@@ -1,33 +1,61 @@
-from typing import List
+from typing import List, Tuple
+
+from soaptools.helpers.py import Immutable, intern
 from soaptools.soap.schema_parser.restriction_elements import RestrictionDeclaration
 
 
-class Declaration:
+class Declaration(Immutable):
+    """
+    Declarations are immutable, so code generators can share them instead of copying.
+
+    Names, namespaces and QNames are interned, so each distinct string is kept in memory once,
+    no matter how many declarations refer to it.
+    """
+    __slots__ = ("name", "target_namespace")
+    _fields = ("name", "target_namespace")
+
     name: str
     target_namespace: str
 
     def __init__(self, name: str, target_namespace: str):
-        self.name = name
-        self.target_namespace = target_namespace
+        object.__setattr__(self, "name", intern(name))
+        object.__setattr__(self, "target_namespace", intern(target_namespace))
 
     @property
     def identifier(self):
         return f"{{{self.target_namespace}}}{self.name}"
 
+    @property
+    def references(self) -> Tuple[str, ...]:
+        """
+        Identifiers of types this declaration depends on, including built-in xs types.
+        """
+        return ()
+
 
 class TypeDeclaration(Declaration):
-    pass
+    __slots__ = ()
 
 
 class SimpleTypeDeclaration(TypeDeclaration):
+    __slots__ = ("restriction",)
+    _fields = TypeDeclaration._fields + __slots__
+
     restriction: RestrictionDeclaration
 
     def __init__(self, name: str, target_namespace: str, restriction: RestrictionDeclaration):
         super().__init__(name, target_namespace)
-        self.restriction = restriction
+        object.__setattr__(self, "restriction", restriction)
+
+    @property
+    def references(self) -> Tuple[str, ...]:
+        return (self.restriction.base,)
 
 
 class ElementDeclaration(Declaration):
+    __slots__ = ("type", "default", "min_occurs", "max_occurs", "nillable")
+    _fields = Declaration._fields + __slots__
+
     type: str
     default: str
     min_occurs: int
@@ -45,18 +73,27 @@ class ElementDeclaration(Declaration):
         nillable: bool = False,
             ):
         super().__init__(name, target_namespace)
-        self.name = name
-        self.target_namespace = target_namespace
-        self.type = type
-        self.default = default
-        self.min_occurs = min_occurs
-        self.max_occurs = max_occurs
-        self.nillable = nillable
+        object.__setattr__(self, "type", intern(type))
+        object.__setattr__(self, "default", default)
+        object.__setattr__(self, "min_occurs", min_occurs)
+        object.__setattr__(self, "max_occurs", max_occurs)
+        object.__setattr__(self, "nillable", nillable)
+
+    @property
+    def references(self) -> Tuple[str, ...]:
+        return (self.type,) if self.type is not None else ()
 
 
 class ComplexTypeDeclaration(TypeDeclaration):
-    elements: List[ElementDeclaration]
+    __slots__ = ("elements",)
+    _fields = TypeDeclaration._fields + __slots__
+
+    elements: Tuple[ElementDeclaration, ...]
 
     def __init__(self, name: str, target_namespace: str, elements: List[ElementDeclaration]):
         super().__init__(name, target_namespace)
-        self.elements = elements
+        object.__setattr__(self, "elements", tuple(elements))
+
+    @property
+    def references(self) -> Tuple[str, ...]:
+        return tuple(reference for element in self.elements for reference in element.references)
@@ -1,23 +1,105 @@
-from typing import List, Dict, Union
+from typing import List, Dict, Union, Optional, Set, Iterable, Iterator, Tuple, Callable
 
 import lxml.etree
 
 from soaptools.exceptions import ApplicationException
-from soaptools.helpers.lxml import get_full_identifier, xml_val_to_python_val
-from soaptools.helpers.py import get_content_from_uri, Logger
+from soaptools.helpers.lxml import QNameResolver, xml_val_to_python_val
+from soaptools.helpers.py import Logger, resolve_location
+from soaptools.soap.cache import DeclarationCache
+from soaptools.soap.loader import DocumentLoader
 from soaptools.soap.namespaces import XS_NAMESPACE, MS_SERIALIZATION_NAMESPACE
 from soaptools.soap.schema_parser.declarations import ComplexTypeDeclaration, SimpleTypeDeclaration, \
     ElementDeclaration, RestrictionDeclaration, TypeDeclaration
 from soaptools.soap.schema_parser.restriction_elements import PatternRestrictionDeclaration, \
     MaxInclusiveRestrictionDeclaration, MinInclusiveRestrictionDeclaration, EnumerationRestrictionDeclaration
 
+# tags in Clark notation, built once instead of for every compared node
+XS_IMPORT = f"{{{XS_NAMESPACE}}}import"
+XS_INCLUDE = f"{{{XS_NAMESPACE}}}include"
+XS_ELEMENT = f"{{{XS_NAMESPACE}}}element"
+XS_SIMPLE_TYPE = f"{{{XS_NAMESPACE}}}simpleType"
+XS_COMPLEX_TYPE = f"{{{XS_NAMESPACE}}}complexType"
+XS_ATTRIBUTE = f"{{{XS_NAMESPACE}}}attribute"
+XS_ANNOTATION = f"{{{XS_NAMESPACE}}}annotation"
+XS_RESTRICTION = f"{{{XS_NAMESPACE}}}restriction"
+XS_ENUMERATION = f"{{{XS_NAMESPACE}}}enumeration"
+XS_SEQUENCE_ELEMENT_PATH = f"{{{XS_NAMESPACE}}}sequence/{{{XS_NAMESPACE}}}element"
+XS_COMPLEX_TYPE_SEQUENCE_PATH = f"{{{XS_NAMESPACE}}}complexType/{{{XS_NAMESPACE}}}sequence"
+MS_ENUMERATION_VALUE_PATH = f"{{{XS_NAMESPACE}}}annotation/{{{XS_NAMESPACE}}}appinfo/{{{MS_SERIALIZATION_NAMESPACE}}}EnumerationValue"
+
+# restriction facet tag -> (declaration class, its keyword argument)
+RESTRICTION_FACETS = {
+    f"{{{XS_NAMESPACE}}}pattern": (PatternRestrictionDeclaration, "pattern"),
+    f"{{{XS_NAMESPACE}}}minInclusive": (MinInclusiveRestrictionDeclaration, "min"),
+    f"{{{XS_NAMESPACE}}}maxInclusive": (MaxInclusiveRestrictionDeclaration, "max"),
+}
+
+# <xs:element/> attribute inside of sequence -> ElementDeclaration keyword argument
+ELEMENT_ATTRIBUTES = {
+    "default": "default",
+    "minOccurs": "min_occurs",
+    "maxOccurs": "max_occurs",
+    "nillable": "nillable",
+}
+
+
+def get_schema_declarations(
+    schema_location: str,
+    loader: DocumentLoader = None,
+    cache: DeclarationCache = None,
+    roots: Iterable[str] = None,
+    stream: bool = False
+) -> List[TypeDeclaration]:
+    """
+    :param roots: identifiers ({namespace}name) of elements and types to start from,
+    only declarations reachable from them are parsed. All declarations are parsed if not passed
+    :param stream: parse documents incrementally instead of loading them whole, see SchemaParser.stream_declarations
+    """
+    if stream and roots is not None:
+        raise ApplicationException("roots can't be used together with streaming parse")
+    loader = loader or DocumentLoader()
+    roots = sorted(set(roots)) if roots is not None else None
+    # keyed by absolute location, the same relative one means other document in other working directory
+    cache_key = f"xsd:{resolve_location(schema_location)}"
+    if roots is not None:
+        cache_key += ":roots:" + " ".join(roots)
+    if cache is not None and (cached := cache.get(cache_key, loader)) is not None:
+        types_declarations, sources = cached
+        loader.set_sources(schema_location, sources)
+        return types_declarations
+
+    if stream:
+        parser = SchemaParser([], loader)
+        types_declarations = list(parser.stream_declarations(schema_location))
+        sources = {location: loader.get_digest(location) for location in parser.parsed_locations}
+        loader.set_sources(schema_location, sources)
+    else:
+        types_declarations = SchemaParser(loader.load(schema_location), loader).get_declarations(roots)
+        sources = loader.get_sources(schema_location)
+
+    if cache is not None:
+        cache.set(cache_key, types_declarations, sources)
+    return types_declarations
+
 
 class SchemaParser:
+    """
+    Schemas are walked first (imports and includes followed), collecting top-level definitions nodes only.
+    Declarations are then built either for all of them, or only for ones reachable from given roots.
+    """
     schemas: Dict[str, lxml.etree._Element]
     resolved_namespaces: List[str]
+    parsed_locations: Set[str]
     types_declarations: List[TypeDeclaration]
+    loader: DocumentLoader
+    qname_resolver: QNameResolver
+    # top-level definitions in document order: (parse method, node, target namespace)
+    definitions: List[Tuple[Callable, lxml.etree._Element, str]]
+    # identifier -> positions in definitions, elements and types may share identifier
+    definitions_positions: Dict[str, List[int]]
+    parsed_definitions: Dict[int, Union[TypeDeclaration, ElementDeclaration]]
 
-    def __init__(self, schemas):
+    def __init__(self, schemas, loader: DocumentLoader = None):
         if not isinstance(schemas, List):
             schemas: List[lxml.etree._Element] = [schemas]
 
@@ -25,18 +107,133 @@ class SchemaParser:
             schema.attrib["targetNamespace"]: schema
             for schema in schemas
         }
+        self.loader = loader or DocumentLoader()
+        self.__definition_parsers = {
+            XS_ELEMENT: self.__parse_element,
+            XS_SIMPLE_TYPE: self.__parse_simple_type,
+            XS_COMPLEX_TYPE: self.__parse_complex_type,
+        }
+        self.__schema_node_handlers = {
+            XS_IMPORT: self.__handle_import,
+            XS_INCLUDE: self.__handle_include,
+            XS_ATTRIBUTE: self.__handle_attribute,
+            XS_ANNOTATION: self.__skip_node,
+            **{tag: self.__handle_definition(parse) for tag, parse in self.__definition_parsers.items()}
+        }
 
-    def get_declarations(self) -> List[TypeDeclaration]:
-        self.resolved_namespaces = []
-        self.types_declarations = []
+    def get_declarations(self, roots: Iterable[str] = None) -> List[TypeDeclaration]:
+        """
+        :param roots: identifiers ({namespace}name) of elements and types, e.g. parts of WSDL messages.
+        If passed, only declarations reachable from them are parsed, unknown identifiers are ignored
+        """
+        self.__reset()
+        self.loader.prefetch_schemas(self.schemas.values())
 
-        for schema in self.schemas.values():
+        for schema in list(self.schemas.values()):
             try:
                 self.__parse_schema(schema)
             except self.AlreadyParsedException:
                 continue
+
+        if roots is None:
+            positions = range(len(self.definitions))
+        else:
+            positions = sorted(self.__get_reachable_positions(roots))
+        self.types_declarations = [self.__parse_definition(position) for position in positions]
         return self.types_declarations
 
+    def stream_declarations(self, schema_location: str) -> Iterator[TypeDeclaration]:
+        """
+        Parses schema document (and documents it imports and includes) incrementally, with iterparse.
+        Every top-level node is turned into declaration as soon as its end tag is read, and then dropped,
+        so only one top-level definition of each open document is in memory at once, never the whole tree.
+
+        Schemas passed to constructor are not used, referenced documents are fetched when reached, not prefetched.
+        """
+        self.__reset()
+        yield from self.__stream_schema(schema_location)
+
+    def __reset(self):
+        self.resolved_namespaces = []
+        self.parsed_locations = set()
+        self.types_declarations = []
+        self.qname_resolver = QNameResolver()
+        self.definitions = []
+        self.definitions_positions = {}
+        self.parsed_definitions = {}
+
+    def __stream_schema(self, location: str, base: str = None, is_include=False) -> Iterator[TypeDeclaration]:
+        location = resolve_location(location, base)
+        if location in self.parsed_locations:
+            return
+        self.parsed_locations.add(location)
+
+        depth = 0
+        schema_namespace = None
+        for event, node in self.loader.iterparse(location):
+            if event == "start":
+                depth += 1
+                if depth == 1:
+                    schema_namespace = node.attrib["targetNamespace"]
+                    if not is_include:
+                        if schema_namespace in self.resolved_namespaces:
+                            return
+                        self.resolved_namespaces.append(schema_namespace)
+                continue
+
+            depth -= 1
+            if depth != 1:
+                continue
+
+            tag = node.tag
+            if (parse := self.__definition_parsers.get(tag)) is not None:
+                target_namespace = node.attrib.get("targetNamespace") or schema_namespace
+                yield parse(node, target_namespace, self.qname_resolver.get_scope(node, whole_document=False))
+            elif tag == XS_IMPORT:
+                if node.attrib["namespace"] not in self.resolved_namespaces:
+                    if "schemaLocation" not in node.attrib:
+                        raise self.ImportSchemaException(f"Node {lxml.etree.tostring(node)} doesn't contain schemaLocation")
+                    yield from self.__stream_schema(node.attrib["schemaLocation"], location)
+            elif tag == XS_INCLUDE:
+                if not (schema_location := node.attrib.get("schemaLocation")):
+                    raise self.ParsingException("Encountered <xs:include/> without schemaLocation")
+                yield from self.__stream_schema(schema_location, location, is_include=True)
+            elif (handler := self.__schema_node_handlers.get(tag)) is not None:
+                # nodes without declarations, like <xs:annotation/>
+                handler(node, schema_namespace)
+            else:
+                raise self.ParsingException(f"Unsupported node {tag}")
+
+            # drop processed node and already processed siblings still referenced by root
+            node.clear()
+            parent = node.getparent()
+            while node.getprevious() is not None:
+                del parent[0]
+
+    def __get_reachable_positions(self, roots: Iterable[str]) -> Set[int]:
+        """
+        Parses definitions reachable from roots, returns their positions.
+        Parsed declarations are memoized, so each of them is parsed once.
+        """
+        reachable = set()
+        pending = list(roots)
+        while pending:
+            for position in self.definitions_positions.get(pending.pop(), ()):
+                if position in reachable:
+                    continue
+                reachable.add(position)
+                pending.extend(self.__parse_definition(position).references)
+        return reachable
+
+    def __parse_definition(self, position: int) -> Union[TypeDeclaration, ElementDeclaration]:
+        if (declaration := self.parsed_definitions.get(position)) is None:
+            parse, node, target_namespace = self.definitions[position]
+            declaration = self.loader.get_definition(
+                node, target_namespace, lambda: parse(node, target_namespace, self.qname_resolver.get_scope(node))
+            )
+            self.parsed_definitions[position] = declaration
+        return declaration
+
     def __import_schema(self, import_node: lxml.etree._Element) -> lxml.etree._Element:
         schema_namespace = import_node.attrib["namespace"]
 
@@ -49,127 +246,158 @@ class SchemaParser:
 
         schema_location = import_node.attrib["schemaLocation"]
         try:
-            self.schemas[schema_namespace] = lxml.etree.fromstring(get_content_from_uri(schema_location).encode())
+            self.schemas[schema_namespace] = self.loader.load(schema_location, import_node.base)
         except:
             raise self.ImportSchemaException(f"Import of {schema_location} failed. Schema not found")
         return self.schemas[schema_namespace]
 
-    def __get_included_schema(self, include_node: lxml.etree._Element) -> lxml.etree._Element:
-        # todo: add handling if was schema already included
+    def __get_included_schema(self, include_node: lxml.etree._Element) -> Optional[lxml.etree._Element]:
+        """
+        Returns None if document was already included (or is being parsed, in case of include cycle)
+        """
         schema_location = include_node.attrib.get("schemaLocation")
         if not schema_location:
             raise self.ParsingException("Encountered <xs:include/> without schemaLocation")
-        return lxml.etree.fromstring(get_content_from_uri(schema_location).encode())
+        if resolve_location(schema_location, include_node.base) in self.parsed_locations:
+            return None
+        return self.loader.load(schema_location, include_node.base)
 
     def __parse_schema(self, schema: lxml.etree._Element, is_include=False):
         schema_namespace = schema.attrib["targetNamespace"]
-        if schema_namespace in self.resolved_namespaces:
-            raise self.AlreadyParsedException()
-
-        for node in schema.getchildren():
-            # read as other namespace
-            if node.tag == f"{{{XS_NAMESPACE}}}import":
-                try:
-                    self.__parse_schema(self.__import_schema(node))
-                except self.AlreadyParsedException:
-                    continue
-            elif node.tag == f"{{{XS_NAMESPACE}}}include":
-                self.__parse_schema(self.__get_included_schema(node), is_include=True)
-            elif node.tag == f"{{{XS_NAMESPACE}}}element":
-                parse_result = self.__parse_element(node, node.attrib.get("targetNamespace") or schema_namespace)
-                self.types_declarations.append(parse_result)
-            elif node.tag == f"{{{XS_NAMESPACE}}}simpleType":
-                self.types_declarations.append(self.__parse_simple_type(node, node.attrib.get("targetNamespace") or schema_namespace))
-            elif node.tag == f"{{{XS_NAMESPACE}}}complexType":
-                self.types_declarations.append(self.__parse_complex_type(node, node.attrib.get("targetNamespace") or schema_namespace))
-            elif node.tag == f"{{{XS_NAMESPACE}}}attribute":
-                Logger.warning("<xs:attribute> is not supported yet")
-            elif node.tag == f"{{{XS_NAMESPACE}}}annotation":
-                continue
-            else:
-                raise self.ParsingException(f"Unsupported node {node.tag}")
+        # marked before walking children, so import and include cycles end here
         if not is_include:
+            if schema_namespace in self.resolved_namespaces:
+                raise self.AlreadyParsedException()
             self.resolved_namespaces.append(schema_namespace)
+        if schema.getparent() is None and schema.base:
+            self.parsed_locations.add(resolve_location(schema.base))
+
+        for node in schema:
+            # comments and processing instructions
+            if not isinstance(node.tag, str):
+                continue
+            handler = self.__schema_node_handlers.get(node.tag)
+            if handler is None:
+                raise self.ParsingException(f"Unsupported node {node.tag}")
+            handler(node, schema_namespace)
+
+    # top-level nodes handlers
+    def __handle_import(self, node: lxml.etree._Element, schema_namespace: str):
+        # read as other namespace
+        try:
+            self.__parse_schema(self.__import_schema(node))
+        except self.AlreadyParsedException:
+            pass
+
+    def __handle_include(self, node: lxml.etree._Element, schema_namespace: str):
+        if (included_schema := self.__get_included_schema(node)) is not None:
+            self.__parse_schema(included_schema, is_include=True)
+
+    def __handle_definition(self, parse):
+        """
+        Definitions are only recorded here, they are parsed once schemas walk is done
+        """
+        def handler(node: lxml.etree._Element, schema_namespace: str):
+            target_namespace = node.attrib.get("targetNamespace") or schema_namespace
+            identifier = f"{{{target_namespace}}}{node.attrib['name']}"
+            self.definitions_positions.setdefault(identifier, []).append(len(self.definitions))
+            self.definitions.append((parse, node, target_namespace))
+        return handler
+
+    def __handle_attribute(self, node: lxml.etree._Element, schema_namespace: str):
+        Logger.warning("<xs:attribute> is not supported yet")
+
+    def __skip_node(self, node: lxml.etree._Element, schema_namespace: str):
+        pass
 
     # elements parsers
-    def __parse_complex_type(self, node: lxml.etree._Element, target_namespace: str) -> ComplexTypeDeclaration:
+    def __parse_complex_type(
+        self,
+        node: lxml.etree._Element,
+        target_namespace: str,
+        scope: QNameResolver.Scope
+    ) -> ComplexTypeDeclaration:
         name = node.attrib["name"]
         elements = []
-        for element_node in node.findall(f"{{{XS_NAMESPACE}}}sequence/{{{XS_NAMESPACE}}}element"):
+        for element_node in node.iterfind(XS_SEQUENCE_ELEMENT_PATH):
+            attrib = element_node.attrib
             kwargs = {
-                "default": "default",
-                "minOccurs": "min_occurs",
-                "maxOccurs": "max_occurs",
-                "nillable": "nillable"
-            }
-            kwargs = {
-                decl_attrib: xml_val_to_python_val(element_node.attrib[node_attrib])
-                for node_attrib, decl_attrib in kwargs.items() if node_attrib in element_node.attrib
+                decl_attrib: xml_val_to_python_val(attrib[node_attrib])
+                for node_attrib, decl_attrib in ELEMENT_ATTRIBUTES.items() if node_attrib in attrib
             }
             elements.append(
                 ElementDeclaration(
-                    name=element_node.attrib["name"],
-                    target_namespace=element_node.attrib.get("targetNamespace") or target_namespace,
-                    type=get_full_identifier(element_node.attrib["type"], element_node.nsmap),
+                    name=attrib["name"],
+                    target_namespace=attrib.get("targetNamespace") or target_namespace,
+                    type=scope.resolve(attrib["type"], element_node),
                     **kwargs
                 )
             )
 
         return ComplexTypeDeclaration(name=name, target_namespace=target_namespace, elements=elements)
 
-    def __parse_restriction(self, node: lxml.etree._Element) -> RestrictionDeclaration:
+    def __parse_restriction(self, node: lxml.etree._Element, scope: QNameResolver.Scope) -> RestrictionDeclaration:
         restriction_elements = []
 
         enumeration_options = {}
-        for restriction_element in node.getchildren():
+        for restriction_element in node:
+            tag = restriction_element.tag
+            if not isinstance(tag, str):
+                continue
             value = xml_val_to_python_val(restriction_element.attrib["value"])
-            if restriction_element.tag == f"{{{XS_NAMESPACE}}}pattern":
-                restriction_elements.append(PatternRestrictionDeclaration(pattern=value))
-            elif restriction_element.tag == f"{{{XS_NAMESPACE}}}minInclusive":
-                restriction_elements.append(MinInclusiveRestrictionDeclaration(min=value))
-            elif restriction_element.tag == f"{{{XS_NAMESPACE}}}maxInclusive":
-                restriction_elements.append(MaxInclusiveRestrictionDeclaration(max=value))
-            elif restriction_element.tag == f"{{{XS_NAMESPACE}}}enumeration":
+            if tag == XS_ENUMERATION:
                 enum_key = enum_value = value
-                enum_value_node = restriction_element.find(f"{{{XS_NAMESPACE}}}annotation/{{{XS_NAMESPACE}}}appinfo/{{{MS_SERIALIZATION_NAMESPACE}}}EnumerationValue")
+                enum_value_node = restriction_element.find(MS_ENUMERATION_VALUE_PATH)
                 if enum_value_node is not None:
                     enum_value = enum_value_node.text
                 enumeration_options[enum_key] = enum_value
+            elif (facet := RESTRICTION_FACETS.get(tag)) is not None:
+                restriction_class, argument = facet
+                restriction_elements.append(restriction_class(**{argument: value}))
             else:
-                raise self.ParsingException(f"Unsupported restriction: <{restriction_element.tag}>")
+                raise self.ParsingException(f"Unsupported restriction: <{tag}>")
         if enumeration_options:
             restriction_elements.append(EnumerationRestrictionDeclaration(enumeration_options=enumeration_options))
 
         return RestrictionDeclaration(
-            base=get_full_identifier(node.attrib["base"], node.nsmap),
+            base=scope.resolve(node.attrib["base"], node),
             rules=restriction_elements
         )
 
-    def __parse_simple_type(self, node: lxml.etree._Element, target_namespace: str) -> SimpleTypeDeclaration:
+    def __parse_simple_type(
+        self,
+        node: lxml.etree._Element,
+        target_namespace: str,
+        scope: QNameResolver.Scope
+    ) -> SimpleTypeDeclaration:
         name = node.attrib["name"]
-        restriction_node = node.find(f"{{{XS_NAMESPACE}}}restriction")
+        restriction_node = node.find(XS_RESTRICTION)
         if restriction_node is None:
             raise self.ParsingException("<xs:restriction/> is required for <xs:simpleType>")
         return SimpleTypeDeclaration(
             name=name,
             target_namespace=target_namespace,
-            restriction=self.__parse_restriction(restriction_node),
+            restriction=self.__parse_restriction(restriction_node, scope),
         )
 
-    def __parse_element(self, node: lxml.etree._Element, target_namespace: str) -> Union[ElementDeclaration, ComplexTypeDeclaration]:
+    def __parse_element(
+        self,
+        node: lxml.etree._Element,
+        target_namespace: str,
+        scope: QNameResolver.Scope
+    ) -> Union[ElementDeclaration, ComplexTypeDeclaration]:
         name = node.attrib["name"]
 
         if type := node.attrib.get("type"):
-            return ElementDeclaration(name=name, target_namespace=target_namespace, type=get_full_identifier(type, node.nsmap))
-        elif node.find(f"{{{XS_NAMESPACE}}}complexType/{{{XS_NAMESPACE}}}sequence") is not None:
+            return ElementDeclaration(name=name, target_namespace=target_namespace, type=scope.resolve(type, node))
+        elif (sequence_node := node.find(XS_COMPLEX_TYPE_SEQUENCE_PATH)) is not None:
             # then we consider it as complexType not element, weird but works
-            subelements = node.find(f"{{{XS_NAMESPACE}}}complexType/{{{XS_NAMESPACE}}}sequence").getchildren()
             return ComplexTypeDeclaration(
                 name=name,
                 target_namespace=target_namespace,
                 elements=[
-                    ElementDeclaration(name=subelement.attrib["name"], target_namespace="TODO", type=get_full_identifier(subelement.attrib["type"], subelement.nsmap))
-                    for subelement in subelements
+                    ElementDeclaration(name=subelement.attrib["name"], target_namespace="TODO", type=scope.resolve(subelement.attrib["type"], subelement))
+                    for subelement in sequence_node if isinstance(subelement.tag, str)
                 ]
             )
         else:
@@ -1,33 +1,66 @@
-from dataclasses import dataclass
-from typing import List, Dict
+from types import MappingProxyType
+from typing import List, Mapping
 
+from soaptools.helpers.py import Immutable, intern
 
-class RestrictionRuleDeclaration:
-    pass
 
+class RestrictionRuleDeclaration(Immutable):
+    __slots__ = ()
+
+
+class RestrictionDeclaration(Immutable):
+    __slots__ = ("base", "rules")
+    _fields = __slots__
 
-@dataclass
-class RestrictionDeclaration:
     base: str
     rules: List[RestrictionRuleDeclaration]
 
+    def __init__(self, base: str, rules: List[RestrictionRuleDeclaration]):
+        object.__setattr__(self, "base", intern(base))
+        object.__setattr__(self, "rules", tuple(rules))
+
 
-@dataclass
 class MinInclusiveRestrictionDeclaration(RestrictionRuleDeclaration):
+    __slots__ = ("min",)
+    _fields = __slots__
+
     min: int
 
+    def __init__(self, min: int):
+        object.__setattr__(self, "min", intern(min))
+
 
-@dataclass
 class MaxInclusiveRestrictionDeclaration(RestrictionRuleDeclaration):
+    __slots__ = ("max",)
+    _fields = __slots__
+
     max: int
 
+    def __init__(self, max: int):
+        object.__setattr__(self, "max", intern(max))
+
 
-@dataclass
 class EnumerationRestrictionDeclaration(RestrictionRuleDeclaration):
-    enumeration_options: Dict[str, str]
+    __slots__ = ("enumeration_options",)
+    _fields = __slots__
+
+    enumeration_options: Mapping[str, str]
+
+    def __init__(self, enumeration_options: Mapping[str, str]):
+        object.__setattr__(self, "enumeration_options", MappingProxyType({
+            intern(key): intern(value) for key, value in enumeration_options.items()
+        }))
+
+    def __reduce__(self):
+        # mappingproxy can't be pickled
+        return self.__class__, (dict(self.enumeration_options),)
 
 
-@dataclass
 class PatternRestrictionDeclaration(RestrictionRuleDeclaration):
+    __slots__ = ("pattern",)
+    _fields = __slots__
+
     pattern: str
 
+    def __init__(self, pattern: str):
+        object.__setattr__(self, "pattern", intern(pattern))
@@ -3,6 +3,7 @@ from dataclasses import dataclass
 from typing import List
 
 from soaptools.soap.schema_parser.declarations import TypeDeclaration
+from soaptools.soap.loader import DocumentLoader
 from soaptools.soap.namespaces import WSDL_NAMESPACE
 from .subparsers.message.declarations import MessageDeclaration
 from .subparsers.port_type.declarations import PortTypeDeclaration
@@ -19,12 +20,25 @@ class WsdlDeclaration:
     service: ServiceDeclaration
 
     @classmethod
-    def from_lxml(cls, node: lxml.etree._Element, wsdl_url: str) -> "WsdlDeclaration":
+    def from_lxml(
+        cls,
+        node: lxml.etree._Element,
+        wsdl_url: str,
+        loader: DocumentLoader = None,
+        lazy: bool = False
+    ) -> "WsdlDeclaration":
+        """
+        :param lazy: parse only types reachable from messages parts, instead of every type in <wsdl:types/>
+        """
+        messages = [MessageDeclaration.from_lxml(message) for message in node.findall(f"{{{WSDL_NAMESPACE}}}message")]
+        roots = None
+        if lazy:
+            roots = [part.element or part.type for message in messages for part in message.parts]
         return cls(
             wsdl_url=wsdl_url,
-            messages=[MessageDeclaration.from_lxml(message) for message in node.findall(f"{{{WSDL_NAMESPACE}}}message")],
+            messages=messages,
             port_type=PortTypeDeclaration.from_lxml(node.find(f"{{{WSDL_NAMESPACE}}}portType")),
-            types=parse_types_node(node.find(f"{{{WSDL_NAMESPACE}}}types")),
+            types=parse_types_node(node.find(f"{{{WSDL_NAMESPACE}}}types"), loader, roots),
             service=ServiceDeclaration.from_lxml(node.find(f"{{{WSDL_NAMESPACE}}}service"))
         )
 
@@ -1,10 +1,31 @@
-import lxml.etree
 from .declarations import WsdlDeclaration
-from ...helpers.py import get_content_from_uri
+from ..cache import DeclarationCache
+from ..loader import DocumentLoader
+from ...helpers.py import resolve_location
 
 
-def get_wsdl_declaration(wsdl_location: str) -> WsdlDeclaration:
-    input_file_content = get_content_from_uri(wsdl_location)
-    wsdl_tree = lxml.etree.fromstring(input_file_content.encode()).getroottree()
+def get_wsdl_declaration(
+    wsdl_location: str,
+    loader: DocumentLoader = None,
+    cache: DeclarationCache = None,
+    lazy: bool = False
+) -> WsdlDeclaration:
+    """
+    :param lazy: see WsdlDeclaration.from_lxml
+    """
+    loader = loader or DocumentLoader()
+    # keyed by absolute location, the same relative one means other document in other working directory
+    cache_key = f"wsdl:{resolve_location(wsdl_location)}"
+    if lazy:
+        cache_key = f"wsdl:lazy:{resolve_location(wsdl_location)}"
+    if cache is not None and (cached := cache.get(cache_key, loader)) is not None:
+        wsdl_declaration, sources = cached
+        loader.set_sources(wsdl_location, sources)
+        return wsdl_declaration
 
-    return WsdlDeclaration.from_lxml(wsdl_tree, wsdl_location)
+    wsdl_tree = loader.load(wsdl_location).getroottree()
+    wsdl_declaration = WsdlDeclaration.from_lxml(wsdl_tree, wsdl_location, loader, lazy)
+
+    if cache is not None:
+        cache.set(cache_key, wsdl_declaration, loader.get_sources(wsdl_location))
+    return wsdl_declaration
@@ -2,17 +2,20 @@ from typing import List
 import lxml.etree
 
 from soaptools.helpers.lxml import get_full_identifier
+from soaptools.helpers.py import intern
 from soaptools.soap.namespaces import WSDL_NAMESPACE
 from soaptools.soap.wsdl_parser.exceptions import ParsingException
 
 
 class PartDeclaration:
+    __slots__ = ("name", "type", "element")
+
     name: str
-    type: str = None
-    element: str = None
+    type: str
+    element: str
 
     def __init__(self, name: str, type: str = None, element: str = None):
-        self.name = name
+        self.name = intern(name)
 
         if type and element:
             raise ValueError("<wsdl:part/> attributes type and element are mutually exclusive")
@@ -37,11 +40,13 @@ class PartDeclaration:
 
 
 class MessageDeclaration:
+    __slots__ = ("name", "parts")
+
     name: str
     parts: List[PartDeclaration]
 
     def __init__(self, name: str, parts: List[PartDeclaration]):
-        self.name = name
+        self.name = intern(name)
 
         if len(parts) == 0:
             raise ParsingException("Parts are required")
@@ -1,13 +1,21 @@
-from typing import List
+from typing import List, Iterable
 
 import lxml.etree
 
+from soaptools.soap.loader import DocumentLoader
 from soaptools.soap.namespaces import XS_NAMESPACE
 from soaptools.soap.schema_parser.declarations import TypeDeclaration
 from soaptools.soap.schema_parser.parser import SchemaParser
 
 
-def parse_types_node(types_node: lxml.etree._Element) -> List[TypeDeclaration]:
+def parse_types_node(
+    types_node: lxml.etree._Element,
+    loader: DocumentLoader = None,
+    roots: Iterable[str] = None
+) -> List[TypeDeclaration]:
+    """
+    :param roots: see SchemaParser.get_declarations
+    """
     all_schemas_nodes = types_node.findall(f"{{{XS_NAMESPACE}}}schema")
-    return SchemaParser(all_schemas_nodes).get_declarations()
+    return SchemaParser(all_schemas_nodes, loader).get_declarations(roots)
 
@@ -0,0 +1,67 @@
+import json
+import os
+import tempfile
+from unittest import mock
+
+from helpers.utils import SoapToolsTestCase
+from soaptools.exceptions import ApplicationException
+
+
+class GenerateBatchTestCase(SoapToolsTestCase):
+
+    def test_batch_of_local_inputs(self):
+        wsdl_location = self.get_fixture_path(["wsdls", "text_casing.wsdl"])
+        schema_location = self.get_fixture_path(["xsds", "namespaces", "orders.xsd"])
+        with tempfile.TemporaryDirectory() as output_directory:
+            config_location = os.path.join(output_directory, "batch.json")
+            with open(config_location, mode="w") as file:
+                json.dump({"jobs": [
+                    {"action": "generate-client", "arguments": [wsdl_location, os.path.join(output_directory, "client")]},
+                    {"action": "generate-bindings", "arguments": ["--from-xsd", schema_location, os.path.join(output_directory, "orders.py")]},
+                ]}, file)
+
+            self.execute_action(f"generate-batch {config_location} --no-cache --jobs 2")
+
+            self.assertTrue(os.path.exists(os.path.join(output_directory, "client", "client.py")))
+            with open(os.path.join(output_directory, "orders.py")) as file:
+                self.assertIn("class OrderIdSimpleType(xs.StringSimpleType):", file.read())
+
+    def test_invalid_job_fails_before_generation(self):
+        with tempfile.TemporaryDirectory() as output_directory:
+            config_location = os.path.join(output_directory, "batch.json")
+            with open(config_location, mode="w") as file:
+                json.dump({"jobs": [{"action": "generate-everything", "arguments": []}]}, file)
+
+            with self.assertRaises(ApplicationException):
+                self.execute_action(f"generate-batch {config_location} --no-cache")
+
+    def test_no_format_jobs_start_no_format_pool(self):
+        schema_location = self.get_fixture_path(["xsds", "namespaces", "orders.xsd"])
+        with tempfile.TemporaryDirectory() as output_directory:
+            config_location = os.path.join(output_directory, "batch.json")
+            with open(config_location, mode="w") as file:
+                json.dump({"jobs": [
+                    {"action": "generate-bindings", "arguments": ["--from-xsd", schema_location, os.path.join(output_directory, "orders.py"), "--no-format"]},
+                ]}, file)
+
+            with mock.patch("soaptools.actions.generate_batch.ProcessPoolExecutor") as process_pool:
+                self.execute_action(f"generate-batch {config_location} --no-cache")
+
+            process_pool.assert_not_called()
+            self.assertTrue(os.path.exists(os.path.join(output_directory, "orders.py")))
+
+    def test_profile_in_job_is_rejected(self):
+        schema_location = self.get_fixture_path(["xsds", "namespaces", "orders.xsd"])
+        with tempfile.TemporaryDirectory() as output_directory:
+            config_location = os.path.join(output_directory, "batch.json")
+            with open(config_location, mode="w") as file:
+                json.dump({"jobs": [
+                    {"action": "generate-bindings", "arguments": [
+                        "--from-xsd", schema_location, os.path.join(output_directory, "orders.py"),
+                        "--profile", os.path.join(output_directory, "profile.json")
+                    ]},
+                ]}, file)
+
+            with self.assertRaises(ApplicationException):
+                self.execute_action(f"generate-batch {config_location} --no-cache")
+            self.assertFalse(os.path.exists(os.path.join(output_directory, "orders.py")))
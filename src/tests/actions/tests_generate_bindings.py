@@ -1,13 +1,165 @@
+import ast
+import importlib.util
+import json
+import os
+import tempfile
+
 from helpers.utils import SoapToolsTestCase
 from helpers.wsdl_locations import TEXT_CASING_WSDL
+from soaptools.code_generators.python.definitions.generator import TypesCodeGenerator
+from soaptools.soap.schema_parser.parser import get_schema_declarations
+
+ORDERS_WSDL = """<definitions xmlns="http://schemas.xmlsoap.org/wsdl/" xmlns:xs="http://www.w3.org/2001/XMLSchema"
+             xmlns:soap="http://schemas.xmlsoap.org/wsdl/soap/" xmlns:tns="urn:example:orders-service"
+             xmlns:types="urn:example:orders-types" name="Orders" targetNamespace="urn:example:orders-service">
+    <types>
+        <xs:schema targetNamespace="urn:example:orders-types" elementFormDefault="qualified">
+            <xs:element name="Order" type="types:Order"/>
+            <xs:complexType name="Order">
+                <xs:sequence>
+                    <xs:element name="number" type="xs:string"/>
+                </xs:sequence>
+            </xs:complexType>
+            <xs:complexType name="Invoice">
+                <xs:sequence>
+                    <xs:element name="number" type="xs:string"/>
+                </xs:sequence>
+            </xs:complexType>
+        </xs:schema>
+    </types>
+    <message name="GetOrderSoapRequest">
+        <part name="parameters" element="types:Order"/>
+    </message>
+    <portType name="OrdersSoapType">
+        <operation name="GetOrder">
+            <input message="tns:GetOrderSoapRequest"/>
+            <output message="tns:GetOrderSoapRequest"/>
+        </operation>
+    </portType>
+    <binding name="OrdersSoapBinding" type="tns:OrdersSoapType">
+        <soap:binding style="document" transport="http://schemas.xmlsoap.org/soap/http"/>
+        <operation name="GetOrder">
+            <soap:operation soapAction="" style="document"/>
+            <input><soap:body use="literal"/></input>
+            <output><soap:body use="literal"/></output>
+        </operation>
+    </binding>
+    <service name="Orders">
+        <port name="OrdersSoap" binding="tns:OrdersSoapBinding">
+            <soap:address location="https://example.com/orders"/>
+        </port>
+    </service>
+</definitions>
+"""
 
 
 class GenerateBindingsTestCase(SoapToolsTestCase):
 
     def test_bindings_from_wsdl(self):
-        self.execute_action(f"generate-bindings --from-wsdl {TEXT_CASING_WSDL} {self.output_location}")
+        with tempfile.TemporaryDirectory() as output_directory:
+            output_location = os.path.join(output_directory, "text_casing.py")
+            self.execute_action(f"generate-bindings --from-wsdl {TEXT_CASING_WSDL} {output_location}")
+            self.assertTrue(os.path.exists(output_location))
 
     def test_from_xsd(self):
         schema_location = self.get_fixture_path(["xsds", "minimal.xsd"])
-        self.execute_action(f"generate-bindings --from-xsd {schema_location} {self.output_location}")
+        with tempfile.TemporaryDirectory() as output_directory:
+            output_location = os.path.join(output_directory, "minimal.py")
+            self.execute_action(f"generate-bindings --from-xsd {schema_location} {output_location}")
+            self.assertTrue(os.path.exists(output_location))
+
+    def test_from_xsd_without_formatting(self):
+        schema_location = self.get_fixture_path(["xsds", "minimal.xsd"])
+        with tempfile.TemporaryDirectory() as output_directory:
+            formatted_location = os.path.join(output_directory, "formatted.py")
+            unformatted_location = os.path.join(output_directory, "unformatted.py")
+            self.execute_action(f"generate-bindings --from-xsd {schema_location} {formatted_location} --no-cache")
+            self.execute_action(f"generate-bindings --from-xsd {schema_location} {unformatted_location} --no-cache --no-format")
+
+            with open(formatted_location) as file:
+                formatted_code = file.read()
+            with open(unformatted_location) as file:
+                unformatted_code = file.read()
+            # ast.unparse output, as is
+            module = TypesCodeGenerator(get_schema_declarations(schema_location)).generate()
+            self.assertEqual(unformatted_code, ast.unparse(module))
+            self.assertNotEqual(unformatted_code, formatted_code)
+            compile(unformatted_code, unformatted_location, "exec")
+
+    def test_compile_unchecked_hash(self):
+        schema_location = self.get_fixture_path(["xsds", "minimal.xsd"])
+        with tempfile.TemporaryDirectory() as output_directory:
+            output_location = os.path.join(output_directory, "minimal.py")
+            self.execute_action(f"generate-bindings --from-xsd {schema_location} {output_location} --no-cache --compile unchecked-hash")
+
+            with open(importlib.util.cache_from_source(output_location), mode="rb") as file:
+                header = file.read(16)
+            self.assertEqual(header[:4], importlib.util.MAGIC_NUMBER)
+            # hash based .pyc, source isn't checked
+            self.assertEqual(int.from_bytes(header[4:8], "little"), 0b01)
+
+    def test_changed_output_options_rewrite_package(self):
+        schema_location = self.get_fixture_path(["xsds", "namespaces", "invoices.xsd"])
+        with tempfile.TemporaryDirectory() as output_directory:
+            output_location = os.path.join(output_directory, "invoices")
+            command = f"generate-bindings --from-xsd {schema_location} {output_location} --no-cache --layout package"
+            module_path = os.path.join(output_location, "example_invoices.py")
+
+            self.execute_action(f"{command} --no-format")
+            with open(module_path) as file:
+                self.assertIn("name = 'Invoice'", file.read())
+            self.execute_action(command)
+            with open(module_path) as file:
+                self.assertIn('name = "Invoice"', file.read())
+
+            for mode, flags in [("timestamp", 0b00), ("unchecked-hash", 0b01)]:
+                self.execute_action(f"{command} --compile {mode}")
+                with open(importlib.util.cache_from_source(module_path), mode="rb") as file:
+                    self.assertEqual(int.from_bytes(file.read(16)[4:8], "little"), flags)
+            self.execute_action(command)
+            self.assertFalse(os.path.exists(importlib.util.cache_from_source(module_path)))
+
+    def test_roots(self):
+        schema_location = self.get_fixture_path(["xsds", "namespaces", "orders.xsd"])
+        with tempfile.TemporaryDirectory() as output_directory:
+            output_location = os.path.join(output_directory, "customers.py")
+            self.execute_action(f"generate-bindings --from-xsd {schema_location} {output_location} --no-cache --root customers:Customer")
+
+            with open(output_location) as file:
+                code = file.read()
+            self.assertIn("class CustomerComplexType(ComplexType):", code)
+            # reachable from Customer
+            self.assertIn("class OrderIdSimpleType(xs.StringSimpleType):", code)
+            self.assertNotIn("class OrderComplexType(ComplexType):", code)
+
+    def test_roots_from_wsdl(self):
+        with tempfile.TemporaryDirectory() as output_directory:
+            # target namespace of embedded schema differs from one of wsdl, element and type share QName
+            wsdl_location = os.path.join(output_directory, "orders.wsdl")
+            with open(wsdl_location, mode="w") as file:
+                file.write(ORDERS_WSDL)
+            output_location = os.path.join(output_directory, "orders.py")
+            self.execute_action(f"generate-bindings --from-wsdl {wsdl_location} {output_location} --no-cache --root Order")
+
+            with open(output_location) as file:
+                code = file.read()
+            # element identical to type isn't generated, same as without roots
+            self.assertIn("class OrderComplexType(ComplexType):", code)
+            self.assertNotIn("class InvoiceComplexType(ComplexType):", code)
+
+    def test_profile(self):
+        schema_location = self.get_fixture_path(["xsds", "namespaces", "invoices.xsd"])
+        with tempfile.TemporaryDirectory() as output_directory:
+            output_location = os.path.join(output_directory, "invoices")
+            profile_location = os.path.join(output_directory, "profile.json")
+            self.execute_action(
+                f"generate-bindings --from-xsd {schema_location} {output_location} --no-cache --layout package "
+                f"--profile {profile_location}"
+            )
 
+            with open(profile_location) as file:
+                report = json.load(file)
+            self.assertTrue({"fetch", "parse", "generate", "format", "write"} <= report["phases"].keys())
+            self.assertEqual(report["counters"]["documents"], 3)
+            self.assertEqual(report["counters"]["declarations"], 4)
+            self.assertEqual(report["counters"]["classes"], 4)
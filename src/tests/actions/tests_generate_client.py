@@ -1,3 +1,9 @@
+import importlib
+import os
+import shutil
+import sys
+import tempfile
+
 from helpers.utils import SoapToolsTestCase
 from helpers.wsdl_locations import TEXT_CASING_WSDL
 
@@ -5,4 +11,73 @@ from helpers.wsdl_locations import TEXT_CASING_WSDL
 class GenerateClientTestCase(SoapToolsTestCase):
 
     def test_bindings_from_wsdl(self):
-        self.execute_action(f"generate-client {TEXT_CASING_WSDL} {self.output_location}")
+        with tempfile.TemporaryDirectory() as output_directory:
+            output_location = os.path.join(output_directory, "text_casing")
+            self.execute_action(f"generate-client {TEXT_CASING_WSDL} {output_location}")
+            self.assertTrue(os.path.exists(os.path.join(output_location, "client.py")))
+
+    def test_client_from_local_wsdl(self):
+        wsdl_location = self.get_fixture_path(["wsdls", "text_casing.wsdl"])
+        with tempfile.TemporaryDirectory() as output_directory:
+            output_location = os.path.join(output_directory, "text_casing")
+            self.execute_action(f"generate-client {wsdl_location} {output_location} --no-cache")
+
+            self.assertCountEqual(
+                os.listdir(output_location),
+                [".soaptools-manifest.json", "__init__.py", "client.py", "messages.py", "types.py"]
+            )
+            with open(os.path.join(output_location, "client.py")) as file:
+                self.assertIn("class TextCasingClient(SoapClient):", file.read())
+
+    def test_unchanged_client_is_not_regenerated(self):
+        wsdl_location = self.get_fixture_path(["wsdls", "text_casing.wsdl"])
+        with tempfile.TemporaryDirectory() as output_directory:
+            output_location = os.path.join(output_directory, "text_casing")
+            self.execute_action(f"generate-client {wsdl_location} {output_location} --no-cache")
+            self.assertIn(".soaptools-manifest.json", os.listdir(output_location))
+
+            client_path = os.path.join(output_location, "client.py")
+            types_path = os.path.join(output_location, "types.py")
+            with open(client_path, mode="a") as file:
+                file.write("# edited")
+            types_modified = os.stat(types_path).st_mtime_ns
+
+            self.execute_action(f"generate-client {wsdl_location} {output_location} --no-cache")
+            with open(client_path) as file:
+                self.assertNotIn("# edited", file.read())
+            self.assertEqual(os.stat(types_path).st_mtime_ns, types_modified)
+
+    def test_clients_share_types_package(self):
+        shared_arguments = "--no-cache --shared-types soap_common " \
+                           "--shared-namespace urn:example:orders --shared-namespace urn:example:customers"
+        with tempfile.TemporaryDirectory() as output_directory:
+            for service in ["orders", "invoices"]:
+                wsdl_location = self.get_fixture_path(["wsdls", f"{service}_service.wsdl"])
+                output_location = os.path.join(output_directory, f"{service}_client")
+                self.execute_action(f"generate-client {wsdl_location} {output_location} {shared_arguments}")
+
+            sys.path.insert(0, output_directory)
+            try:
+                shared_types = importlib.import_module("soap_common")
+                self.assertCountEqual(shared_types.__all__, ["OrderIdSimpleType", "CustomerComplexType", "OrderComplexType"])
+                self.assertIs(importlib.import_module("orders_client.types").OrderComplexType, shared_types.OrderComplexType)
+                self.assertIs(importlib.import_module("invoices_client.types").OrderComplexType, shared_types.OrderComplexType)
+                importlib.import_module("orders_client.client")
+            finally:
+                sys.path.remove(output_directory)
+                for module_name in [name for name in sys.modules if name.split(".")[0] in ["soap_common", "orders_client", "invoices_client"]]:
+                    del sys.modules[module_name]
+
+    def test_client_with_removed_shared_types_is_regenerated(self):
+        shared_arguments = "--no-cache --shared-types soap_common " \
+                           "--shared-namespace urn:example:orders --shared-namespace urn:example:customers"
+        with tempfile.TemporaryDirectory() as output_directory:
+            wsdl_location = self.get_fixture_path(["wsdls", "orders_service.wsdl"])
+            output_location = os.path.join(output_directory, "orders_client")
+            shared_types_location = os.path.join(output_directory, "soap_common")
+            self.execute_action(f"generate-client {wsdl_location} {output_location} {shared_arguments}")
+            shared_types_files = sorted(os.listdir(shared_types_location))
+
+            shutil.rmtree(shared_types_location)
+            self.execute_action(f"generate-client {wsdl_location} {output_location} {shared_arguments}")
+            self.assertEqual(sorted(os.listdir(shared_types_location)), shared_types_files)
@@ -0,0 +1,65 @@
+"""
+Resident size of parsed declarations model, for jpk_schema.xsd scaled up synthetically:
+every top-level definition supported by SchemaParser is repeated under new names.
+
+Usage (from src/tests): python -m benchmarks.declarations_memory [copies]
+"""
+import gc
+import pathlib
+import sys
+import tracemalloc
+
+import lxml.etree
+
+from soaptools.soap.namespaces import XS_NAMESPACE
+from soaptools.soap.schema_parser.parser import SchemaParser
+
+JPK_SCHEMA_PATH = pathlib.Path(__file__).parent.parent / "fixtures" / "xsds" / "jpk_schema.xsd"
+
+
+def get_supported_definitions(schema: lxml.etree._Element):
+    for node in schema.iterchildren(f"{{{XS_NAMESPACE}}}simpleType", f"{{{XS_NAMESPACE}}}complexType"):
+        probe = lxml.etree.Element(schema.tag, nsmap=schema.nsmap, targetNamespace=schema.attrib["targetNamespace"])
+        probe.append(lxml.etree.fromstring(lxml.etree.tostring(node)))
+        try:
+            SchemaParser(probe).get_declarations()
+        except Exception:
+            continue
+        yield node
+
+
+def build_scaled_schema(copies: int) -> lxml.etree._Element:
+    jpk_schema = lxml.etree.parse(str(JPK_SCHEMA_PATH)).getroot()
+    definitions = list(get_supported_definitions(jpk_schema))
+
+    schema = lxml.etree.Element(
+        jpk_schema.tag,
+        nsmap=jpk_schema.nsmap,
+        targetNamespace=jpk_schema.attrib["targetNamespace"]
+    )
+    for copy_number in range(copies):
+        for definition in definitions:
+            node = lxml.etree.fromstring(lxml.etree.tostring(definition))
+            node.attrib["name"] = f"{node.attrib['name']}{copy_number}"
+            schema.append(node)
+    return schema
+
+
+def measure(copies: int):
+    schema = build_scaled_schema(copies)
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    declarations = SchemaParser(schema).get_declarations()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    size = after - before
+    print(f"declarations: {len(declarations)}")
+    print(f"resident: {size / 1024 / 1024:.2f} MB, {size / len(declarations):.0f} B per declaration")
+
+
+if __name__ == "__main__":
+    measure(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,83 @@
+"""
+Memory of decoded response: rows of complex type with simple fields and nested complex one,
+decoded from lxml tree with from_lxml_node, measured with tracemalloc (lxml tree itself isn't traced).
+
+Usage (from src/tests): python -m benchmarks.instances_memory [rows]
+"""
+import gc
+import sys
+import tracemalloc
+
+import lxml.etree
+
+from soaptools.code_generators.python.definitions.types import ComplexType, xs
+from soaptools.code_generators.python.definitions.types.base import Element
+
+NAMESPACE = "urn:example:benchmark"
+
+
+class AddressComplexType(ComplexType):
+    __slots__ = ()
+    street = Element(type=xs.StringSimpleType)
+    city = Element(type=xs.StringSimpleType)
+
+    class Meta:
+        name = "Address"
+        targetNamespace = NAMESPACE
+
+
+class RowComplexType(ComplexType):
+    __slots__ = ()
+    id = Element(type=xs.IntSimpleType)
+    name = Element(type=xs.StringSimpleType)
+    price = Element(type=xs.DecimalSimpleType)
+    active = Element(type=xs.BooleanSimpleType)
+    tags = Element(type=xs.StringSimpleType, min_occurs=0, max_occurs="unbounded")
+    address = Element(type=AddressComplexType)
+
+    class Meta:
+        name = "Row"
+        targetNamespace = NAMESPACE
+
+
+class ResponseComplexType(ComplexType):
+    __slots__ = ()
+    row = Element(type=RowComplexType, min_occurs=0, max_occurs="unbounded")
+
+    class Meta:
+        name = "Response"
+        targetNamespace = NAMESPACE
+
+
+def build_response(rows: int) -> lxml.etree._Element:
+    response = lxml.etree.Element(f"{{{NAMESPACE}}}Response", nsmap={None: NAMESPACE})
+    for number in range(rows):
+        row = lxml.etree.SubElement(response, f"{{{NAMESPACE}}}row")
+        for tag, text in [("id", str(number)), ("name", f"item {number}"), ("price", "10.5"), ("active", "true")]:
+            lxml.etree.SubElement(row, f"{{{NAMESPACE}}}{tag}").text = text
+        for tag in ["new", "sale"]:
+            lxml.etree.SubElement(row, f"{{{NAMESPACE}}}tags").text = tag
+        address = lxml.etree.SubElement(row, f"{{{NAMESPACE}}}address")
+        lxml.etree.SubElement(address, f"{{{NAMESPACE}}}street").text = f"street {number}"
+        lxml.etree.SubElement(address, f"{{{NAMESPACE}}}city").text = "city"
+    return response
+
+
+def measure(rows: int):
+    node = build_response(rows)
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    response = ResponseComplexType.from_lxml_node(node)
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    size = after - before
+    print(f"rows: {len(response.row)}")
+    print(f"resident: {size / 1024 / 1024:.2f} MB, {size / rows:.0f} B per row")
+
+
+if __name__ == "__main__":
+    measure(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
@@ -0,0 +1,32 @@
+"""
+Wall time of SchemaParser walk, for jpk_schema.xsd scaled up the same way as in declarations_memory.
+lxml parsing of the document is excluded, only the walk over already parsed tree is timed.
+
+Usage (from src/tests): python -m benchmarks.schema_parsing_time [copies] [repeats]
+"""
+import sys
+import time
+
+from benchmarks.declarations_memory import build_scaled_schema
+from soaptools.soap.schema_parser.parser import SchemaParser
+
+
+def measure(copies: int, repeats: int):
+    schema = build_scaled_schema(copies)
+
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        declarations = SchemaParser(schema).get_declarations()
+        timings.append(time.perf_counter() - start)
+
+    best = min(timings)
+    print(f"declarations: {len(declarations)}")
+    print(f"best of {repeats}: {best:.3f} s, {best / len(declarations) * 1e6:.1f} us per declaration")
+
+
+if __name__ == "__main__":
+    measure(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 10000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 5,
+    )
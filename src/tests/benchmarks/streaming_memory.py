@@ -0,0 +1,51 @@
+"""
+Peak memory of parsing jpk_schema.xsd scaled up (see declarations_memory) from file,
+with whole document loaded by DocumentLoader versus streaming parse.
+Peak RSS growth includes resulting declarations. Each mode is measured in fresh subprocess, so neither sees memory of the other nor of the scaled schema build.
+
+Usage (from src/tests): python -m benchmarks.streaming_memory [copies]
+"""
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+
+import lxml.etree
+
+from benchmarks.declarations_memory import build_scaled_schema
+from soaptools.soap.loader import DocumentLoader
+from soaptools.soap.schema_parser.parser import get_schema_declarations
+
+
+def measure_mode(path: str, mode: str):
+    # peak resident size, as lxml allocations are not seen by tracemalloc (which would also inflate it)
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    declarations = get_schema_declarations(path, DocumentLoader(), stream=mode == "stream")
+    after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{mode}: declarations {len(declarations)}, peak RSS growth {(after - before) / 1024:.2f} MB")
+
+
+def write_schema(path: str, copies: int):
+    lxml.etree.ElementTree(build_scaled_schema(copies)).write(path)
+
+
+def measure(copies: int):
+    # schema is written by subprocess too, ru_maxrss of child process starts from parent's resident size on linux
+    module = [sys.executable, "-m", "benchmarks.streaming_memory"]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "schema.xsd")
+        subprocess.run(module + ["--write", path, str(copies)], check=True)
+        print(f"document: {os.path.getsize(path) / 1024 / 1024:.2f} MB")
+
+        for mode in ["dom", "stream"]:
+            subprocess.run(module + ["--mode", mode, path], check=True)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--write":
+        write_schema(sys.argv[2], int(sys.argv[3]))
+    elif len(sys.argv) > 1 and sys.argv[1] == "--mode":
+        measure_mode(sys.argv[3], sys.argv[2])
+    else:
+        measure(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,27 @@
+import lxml.etree
+
+from helpers.utils import SoapToolsTestCase
+from soaptools.code_generators.python.client.types import Message, Part
+from soaptools.code_generators.python.definitions.types import xs
+
+
+class ResultElement(xs.StringSimpleType):
+    __slots__ = ()
+
+    class Meta:
+        name = "Result"
+        targetNamespace = "urn:example:text"
+
+
+class ResultResponse(Message):
+    parameters = Part(type=ResultElement)
+
+
+class MessageTestCase(SoapToolsTestCase):
+
+    def test_from_lxml_simple_part(self):
+        response = lxml.etree.fromstring('<Envelope><Body><Result xmlns="urn:example:text">DONE</Result></Body></Envelope>')
+
+        for lazy in [False, True]:
+            with self.subTest(lazy=lazy):
+                self.assertEqual(ResultResponse.from_lxml(response, lazy).parameters.value, "DONE")
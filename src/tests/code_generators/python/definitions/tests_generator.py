@@ -0,0 +1,33 @@
+import ast
+import io
+
+from helpers.utils import SoapToolsTestCase
+from soaptools.code_generators.python.definitions.generator import TypesCodeGenerator
+from soaptools.helpers.py import format_code
+from soaptools.soap.schema_parser.parser import get_schema_declarations
+
+
+class TypesCodeGeneratorTestCase(SoapToolsTestCase):
+
+    def test_generate_to_writes_same_module_as_generate(self):
+        declarations = get_schema_declarations(self.get_fixture_path(["xsds", "includes", "root.xsd"]))
+        module_code = ast.unparse(TypesCodeGenerator(declarations).generate())
+
+        output = io.StringIO()
+        TypesCodeGenerator(declarations).generate_to(output)
+        self.assertEqual(output.getvalue(), module_code)
+
+        output = io.StringIO()
+        TypesCodeGenerator(declarations).generate_to(output, format_code)
+        self.assertEqual(output.getvalue(), format_code(module_code))
+
+    def test_declarations_are_shared(self):
+        declarations = get_schema_declarations(self.get_fixture_path(["xsds", "includes", "root.xsd"]))
+        generate_only_declarations = declarations[:1]
+        generator = TypesCodeGenerator(declarations, generate_only_declarations)
+        generator.generate()
+
+        self.assertIs(generator.declarations, declarations)
+        self.assertIs(generator.generate_only_declarations, generate_only_declarations)
+        for declaration in declarations:
+            self.assertIs(generator.index.get_declaration(declaration.identifier), declaration)
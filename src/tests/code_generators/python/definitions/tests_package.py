@@ -0,0 +1,73 @@
+import ast
+import importlib
+import os
+import sys
+import tempfile
+
+from helpers.utils import SoapToolsTestCase
+from soaptools.code_generators.python.definitions.generator import TypesCodeGenerator
+from soaptools.code_generators.python.definitions.package import TypesPackageGenerator, get_package_modules
+from soaptools.exceptions import ApplicationException
+from soaptools.soap.schema_parser.parser import get_schema_declarations
+
+
+class TypesPackageGeneratorTestCase(SoapToolsTestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        sys.path.insert(0, self.directory.name)
+
+    def tearDown(self):
+        sys.path.remove(self.directory.name)
+        for module_name in [name for name in sys.modules if name.startswith("generated_types")]:
+            del sys.modules[module_name]
+        self.directory.cleanup()
+
+    def write_package(self, modules):
+        package_directory = os.path.join(self.directory.name, "generated_types")
+        os.mkdir(package_directory)
+        for module_name, module in modules.items():
+            with open(os.path.join(package_directory, module_name + ".py"), mode="w") as file:
+                file.write(ast.unparse(module))
+
+    def test_cyclic_namespaces_are_merged_and_imported_lazily(self):
+        declarations = get_schema_declarations(self.get_fixture_path(["xsds", "namespaces", "invoices.xsd"]))
+        modules = TypesPackageGenerator(TypesCodeGenerator(declarations)).generate()
+        # orders and customers namespaces refer to each other
+        self.assertCountEqual(modules.keys(), ["__init__", "example_orders", "example_invoices"])
+
+        self.write_package(modules)
+        package = importlib.import_module("generated_types")
+        self.assertNotIn("generated_types.example_orders", sys.modules)
+
+        self.assertEqual(package.CustomerComplexType.Meta.targetNamespace, "urn:example:customers")
+        self.assertIn("generated_types.example_orders", sys.modules)
+        self.assertNotIn("generated_types.example_invoices", sys.modules)
+
+    def test_chunks(self):
+        declarations = get_schema_declarations(self.get_fixture_path(["xsds", "minimal.xsd"]))
+        modules = TypesPackageGenerator(TypesCodeGenerator(declarations), chunk_size=1).generate()
+        self.assertGreater(len(modules), 2)
+
+        self.write_package(modules)
+        package = importlib.import_module("generated_types")
+        for name in package.__all__:
+            getattr(package, name)
+
+    def test_same_class_name_in_two_namespaces_is_rejected(self):
+        def get_class_def(namespace):
+            return ast.parse(
+                f"class OrderComplexType(ComplexType):\n"
+                f"    class Meta:\n"
+                f"        name = 'Order'\n"
+                f"        targetNamespace = '{namespace}'"
+            ).body[0]
+
+        with self.assertRaises(ApplicationException):
+            get_package_modules([], [
+                ("example_orders", get_class_def("urn:example:orders")),
+                ("example_invoices", get_class_def("urn:example:invoices")),
+            ])
+        # the same class generated again replaces the other one
+        modules = get_package_modules([], [("example_orders", get_class_def("urn:example:orders"))] * 2)
+        self.assertEqual(ast.literal_eval(modules["__init__"].body[1].value), ["OrderComplexType"])
@@ -0,0 +1,122 @@
+import pickle
+
+import lxml.etree
+
+from helpers.utils import SoapToolsTestCase
+from soaptools.code_generators.python.definitions.exceptions import ValidationException
+from soaptools.code_generators.python.definitions.types import ComplexType, xs
+from soaptools.code_generators.python.definitions.types.base import Element
+
+
+class LineComplexType(ComplexType):
+    __slots__ = ()
+    sku = Element(type=xs.StringSimpleType)
+    quantity = Element(type=xs.IntSimpleType, min_occurs=0)
+    gift = Element(type=xs.BooleanSimpleType, min_occurs=0)
+
+    class Meta:
+        name = "Line"
+        targetNamespace = "urn:example:orders"
+
+
+class OrderComplexType(ComplexType):
+    __slots__ = ()
+    number = Element(type=xs.StringSimpleType)
+    notes = Element(type=xs.StringSimpleType, min_occurs=0, max_occurs="unbounded")
+    lines = Element(type=LineComplexType, min_occurs=0, max_occurs="unbounded")
+
+    class Meta:
+        name = "Order"
+        targetNamespace = "urn:example:orders"
+
+
+class PriorityOrderComplexType(OrderComplexType):
+    priority = Element(type=xs.IntSimpleType)
+
+    class Meta:
+        name = "PriorityOrder"
+        targetNamespace = "urn:example:orders"
+
+
+class ComplexTypeTestCase(SoapToolsTestCase):
+
+    def test_fields_read_and_written_through_elements(self):
+        order = OrderComplexType(number="A1", notes=["fragile", "urgent"], lines=[{"sku": "X", "quantity": 2}])
+
+        self.assertIsInstance(OrderComplexType.number, Element)
+        self.assertEqual(order.number, "A1")
+        self.assertEqual(order.notes, ["fragile", "urgent"])
+        self.assertIs(order.notes, order.notes)
+        self.assertEqual(order.lines[0].quantity, 2)
+
+        order.number = "B2"
+        order.notes = "fragile"
+        self.assertEqual(order.number, "B2")
+        self.assertEqual(order.notes, ["fragile"])
+        self.assertEqual(order.xml_value, {"number": "B2", "notes": ["fragile"], "lines": [{"sku": "X", "quantity": 2, "gift": None}]})
+
+    def test_from_lxml_node(self):
+        node = lxml.etree.fromstring(
+            '<Order xmlns="urn:example:orders"><number>A1</number><lines><sku>X</sku></lines>'
+            '<lines><sku>Y</sku><quantity>3</quantity></lines></Order>'
+        )
+        order = OrderComplexType.from_lxml_node(node)
+
+        self.assertEqual(order.number, "A1")
+        self.assertEqual(order.notes, [])
+        self.assertEqual([(line.sku, line.quantity) for line in order.lines], [("X", None), ("Y", 3)])
+
+    def test_elements_definitions_computed_once_per_class(self):
+        self.assertEqual(list(PriorityOrderComplexType._elements_definitions), ["number", "notes", "lines", "priority"])
+        self.assertIs(OrderComplexType._elements_definitions["lines"], OrderComplexType.lines)
+        with self.assertRaises(TypeError):
+            OrderComplexType._elements_definitions["priority"] = PriorityOrderComplexType.priority
+
+        order = PriorityOrderComplexType(number="A1", priority=1)
+        self.assertEqual(list(order.xml_value), ["number", "notes", "lines", "priority"])
+        self.assertFalse(hasattr(OrderComplexType.Meta, "elements_definitions"))
+
+    def test_simple_values_kept_unwrapped_in_slots(self):
+        line = LineComplexType(sku="X", gift="true")
+
+        self.assertFalse(hasattr(line, "__dict__"))
+        self.assertEqual(line._value, {"sku": "X", "quantity": None, "gift": True})
+        self.assertEqual(line.xml_value, {"sku": "X", "quantity": None, "gift": "true"})
+
+    def test_from_lxml_node_unqualified_and_foreign_children(self):
+        node = lxml.etree.fromstring(
+            '<o:Order xmlns:o="urn:example:orders" xmlns:c="urn:example:common"><number>A1</number>'
+            '<c:notes>fragile</c:notes><o:lines><sku>X</sku><o:gift>true</o:gift></o:lines><!-- end --></o:Order>'
+        )
+        order = OrderComplexType.from_lxml_node(node)
+
+        self.assertEqual(order.number, "A1")
+        self.assertEqual(order.notes, ["fragile"])
+        self.assertEqual([(line.sku, line.gift) for line in order.lines], [("X", True)])
+
+    def test_lazy_from_lxml_node(self):
+        node = lxml.etree.fromstring(
+            '<Order xmlns="urn:example:orders"><number>A1</number><lines><sku>X</sku><gift>maybe</gift></lines>'
+            '<lines><sku>Y</sku><quantity>3</quantity></lines></Order>'
+        )
+        order = OrderComplexType.from_lxml_node(node, lazy=True)
+
+        self.assertEqual(order._value, {})
+        self.assertEqual(order.number, "A1")
+        self.assertEqual(order._value, {"number": "A1"})
+        lines = order.lines
+        self.assertIs(order.lines, lines)
+        self.assertEqual(lines[1].sku, "Y")
+        with self.assertRaises(ValidationException):
+            lines[0].gift
+
+        order.lines = [{"sku": "Z"}]
+        self.assertEqual(order.xml_value, {"number": "A1", "notes": [], "lines": [{"sku": "Z", "quantity": None, "gift": None}]})
+
+    def test_pickle_lazy_instance(self):
+        node = lxml.etree.fromstring(
+            '<Order xmlns="urn:example:orders"><number>A1</number><lines><sku>X</sku><gift>true</gift></lines></Order>'
+        )
+        order = pickle.loads(pickle.dumps(OrderComplexType.from_lxml_node(node, lazy=True)))
+
+        self.assertEqual(order.xml_value, {"number": "A1", "notes": [], "lines": [{"sku": "X", "quantity": None, "gift": "true"}]})
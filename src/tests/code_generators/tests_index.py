@@ -0,0 +1,30 @@
+from unittest import TestCase
+
+from soaptools.code_generators.index import DeclarationIndex
+from soaptools.soap.schema_parser.declarations import ComplexTypeDeclaration, ElementDeclaration
+from soaptools.soap.wsdl_parser.subparsers.message.declarations import MessageDeclaration, PartDeclaration
+
+
+class DeclarationIndexTestCase(TestCase):
+    def test_first_declaration_wins(self):
+        first_type = ComplexTypeDeclaration("Order", "urn:a", [])
+        second_type = ComplexTypeDeclaration("Order", "urn:a", [])
+        element = ElementDeclaration("Order", "urn:a", "{urn:a}Order")
+        first_message = MessageDeclaration("GetOrder", [PartDeclaration("parameters", element="{urn:a}Order")])
+        second_message = MessageDeclaration("GetOrder", [PartDeclaration("parameters", element="{urn:a}Order")])
+
+        index = DeclarationIndex([first_type, element, second_type], [first_message, second_message])
+
+        self.assertIs(index.get_declaration("{urn:a}Order"), first_type)
+        self.assertIs(index.get_type("{urn:a}Order"), first_type)
+        self.assertIs(index.get_element("{urn:a}Order"), element)
+        self.assertIs(index.get_message("GetOrder"), first_message)
+
+    def test_get_message(self):
+        message = MessageDeclaration("GetOrder", [PartDeclaration("parameters", element="{urn:a}Order")])
+        index = DeclarationIndex([], [message])
+
+        for name in ["GetOrder", "tns:GetOrder", "{urn:a}GetOrder", "{http://example.com/orders}GetOrder"]:
+            with self.subTest(name=name):
+                self.assertIs(index.get_message(name), message)
+        self.assertIsNone(index.get_message("tns:GetInvoice"))
@@ -0,0 +1,94 @@
+import http.server
+import os
+import tempfile
+import threading
+from functools import partial
+from unittest import TestCase
+
+from soaptools.exceptions import ApplicationException
+from soaptools.helpers.cache import DocumentCache
+
+
+class CountingRequestHandler(http.server.SimpleHTTPRequestHandler):
+    requests_statuses = []
+    # number of next requests answered with 304 Not Modified, whatever their headers are
+    not_modified_count = 0
+
+    def do_GET(self):
+        if CountingRequestHandler.not_modified_count > 0:
+            CountingRequestHandler.not_modified_count -= 1
+            self.send_response(304)
+            self.end_headers()
+            return
+        super().do_GET()
+
+    def send_response(self, code, message=None):
+        self.requests_statuses.append(code)
+        super().send_response(code, message)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class DocumentCacheTestCase(TestCase):
+    def setUp(self):
+        self.served_directory = tempfile.TemporaryDirectory()
+        self.cache_directory = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.served_directory.name, "schema.xsd"), mode="wb") as file:
+            file.write(b"<schema/>")
+
+        CountingRequestHandler.requests_statuses = []
+        CountingRequestHandler.not_modified_count = 0
+        handler = partial(CountingRequestHandler, directory=self.served_directory.name)
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/schema.xsd"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.served_directory.cleanup()
+        self.cache_directory.cleanup()
+
+    def test_revalidates_with_conditional_request(self):
+        cache = DocumentCache(self.cache_directory.name)
+        self.assertEqual(cache.get(self.url), b"<schema/>")
+        self.assertEqual(cache.get(self.url), b"<schema/>")
+        self.assertEqual(CountingRequestHandler.requests_statuses, [200, 304])
+
+    def test_not_modified_without_entry_is_fetched_again(self):
+        CountingRequestHandler.not_modified_count = 1
+        cache = DocumentCache(self.cache_directory.name)
+        self.assertEqual(cache.get(self.url), b"<schema/>")
+        self.assertEqual(CountingRequestHandler.requests_statuses, [304, 200])
+
+        CountingRequestHandler.not_modified_count = 2
+        with self.assertRaises(ApplicationException):
+            cache.get(self.url.replace("schema.xsd", "other.xsd"))
+
+    def test_fresh_entry_is_not_revalidated(self):
+        cache = DocumentCache(self.cache_directory.name, ttl=3600)
+        cache.get(self.url)
+        cache.get(self.url)
+        self.assertEqual(CountingRequestHandler.requests_statuses, [200])
+
+    def test_offline(self):
+        DocumentCache(self.cache_directory.name).get(self.url)
+        offline_cache = DocumentCache(self.cache_directory.name, offline=True)
+        self.assertEqual(offline_cache.get(self.url), b"<schema/>")
+        self.assertEqual(CountingRequestHandler.requests_statuses, [200])
+
+        with self.assertRaises(DocumentCache.NotCachedException):
+            offline_cache.get(self.url.replace("schema.xsd", "other.xsd"))
+
+    def test_eviction(self):
+        with open(os.path.join(self.served_directory.name, "other.xsd"), mode="wb") as file:
+            file.write(b"<other/>")
+        cache = DocumentCache(self.cache_directory.name, max_size=len(b"<other/>"))
+        cache.get(self.url)
+        cache.get(self.url.replace("schema.xsd", "other.xsd"))
+
+        offline_cache = DocumentCache(self.cache_directory.name, offline=True)
+        with self.assertRaises(DocumentCache.NotCachedException):
+            offline_cache.get(self.url)
+        self.assertEqual(offline_cache.get(self.url.replace("schema.xsd", "other.xsd")), b"<other/>")
@@ -0,0 +1,43 @@
+import time
+import tracemalloc
+
+from helpers.utils import SoapToolsTestCase
+from soaptools.helpers.profiler import Profiler
+
+
+class ProfilerTestCase(SoapToolsTestCase):
+
+    def test_nested_phase_time_is_not_counted_in_outer_one(self):
+        profiler = Profiler()
+        profiler.start()
+        with profiler.phase("parse"):
+            with profiler.phase("fetch"):
+                time.sleep(0.05)
+                data = bytearray(1024 * 1024)
+            del data
+        profiler.count("documents")
+        profiler.count("documents")
+        report = profiler.stop()
+
+        self.assertGreaterEqual(report["phases"]["fetch"]["wall_time"], 0.05)
+        self.assertLess(report["phases"]["parse"]["wall_time"], 0.05)
+        self.assertGreaterEqual(report["phases"]["fetch"]["peak_memory"], 1024 * 1024)
+        self.assertGreaterEqual(report["phases"]["parse"]["peak_memory"], 1024 * 1024)
+        self.assertEqual(report["counters"], {"documents": 2})
+
+    def test_disabled_profiler_records_nothing(self):
+        profiler = Profiler(enabled=False)
+        profiler.start()
+        with profiler.phase("parse"):
+            profiler.count("documents")
+        self.assertEqual(profiler.stop()["phases"], {})
+
+    def test_stops_only_tracing_it_started(self):
+        tracemalloc.start()
+        try:
+            profiler = Profiler()
+            profiler.start()
+            profiler.stop()
+            self.assertTrue(tracemalloc.is_tracing())
+        finally:
+            tracemalloc.stop()
@@ -0,0 +1,39 @@
+import pickle
+from unittest import TestCase
+
+from soaptools.soap.namespaces import XS_NAMESPACE
+from soaptools.soap.schema_parser.declarations import ComplexTypeDeclaration, ElementDeclaration, SimpleTypeDeclaration
+from soaptools.soap.schema_parser.restriction_elements import EnumerationRestrictionDeclaration, RestrictionDeclaration
+
+
+class DeclarationsTestCase(TestCase):
+    def setUp(self):
+        self.enumeration = EnumerationRestrictionDeclaration({"A": "a", "B": "b"})
+        self.simple_type = SimpleTypeDeclaration(
+            "Letter", "urn:a", RestrictionDeclaration(f"{{{XS_NAMESPACE}}}string", [self.enumeration])
+        )
+        self.complex_type = ComplexTypeDeclaration("Order", "urn:a", [ElementDeclaration("letter", "urn:a", "{urn:a}Letter")])
+
+    def test_attribute_assignment_raises(self):
+        for declaration, attribute in [
+            (self.simple_type, "name"),
+            (self.simple_type.restriction, "base"),
+            (self.complex_type, "elements"),
+            (self.complex_type.elements[0], "min_occurs"),
+            (self.enumeration, "enumeration_options"),
+        ]:
+            with self.subTest(declaration=declaration.__class__.__name__):
+                with self.assertRaises(AttributeError):
+                    setattr(declaration, attribute, None)
+                with self.assertRaises(AttributeError):
+                    delattr(declaration, attribute)
+
+    def test_enumeration_options_are_read_only(self):
+        with self.assertRaises(TypeError):
+            self.enumeration.enumeration_options["C"] = "c"
+        self.assertEqual(dict(self.enumeration.enumeration_options), {"A": "a", "B": "b"})
+
+    def test_pickle(self):
+        simple_type = pickle.loads(pickle.dumps(self.simple_type))
+        self.assertEqual(simple_type.identifier, "{urn:a}Letter")
+        self.assertEqual(dict(simple_type.restriction.rules[0].enumeration_options), {"A": "a", "B": "b"})
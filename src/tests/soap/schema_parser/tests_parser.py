@@ -0,0 +1,70 @@
+import lxml.etree
+
+from helpers.utils import SoapToolsTestCase
+from soaptools.soap.loader import DocumentLoader
+from soaptools.soap.namespaces import XS_NAMESPACE
+from soaptools.soap.schema_parser.parser import SchemaParser, get_schema_declarations
+
+
+class SchemaParserTestCase(SoapToolsTestCase):
+
+    def test_diamond_and_cyclic_includes_are_parsed_once(self):
+        loader = DocumentLoader()
+        declarations = get_schema_declarations(self.get_fixture_path(["xsds", "includes", "root.xsd"]), loader)
+
+        self.assertCountEqual(
+            [declaration.name for declaration in declarations],
+            ["OrderType", "Address", "PaymentType", "Order"]
+        )
+        self.assertCountEqual(
+            loader.documents.keys(),
+            [self.get_fixture_path(["xsds", "includes", name]) for name in ["root.xsd", "left.xsd", "right.xsd", "common.xsd"]]
+        )
+
+    def test_declarations_are_shared_by_parsers_of_one_loader(self):
+        loader = DocumentLoader()
+        declarations = get_schema_declarations(self.get_fixture_path(["xsds", "namespaces", "invoices.xsd"]), loader)
+        # orders and customers namespaces, imported by invoices.xsd too
+        other_declarations = get_schema_declarations(self.get_fixture_path(["xsds", "namespaces", "orders.xsd"]), loader)
+
+        self.assertEqual(len(other_declarations), 3)
+        declarations_ids = {id(declaration) for declaration in declarations}
+        self.assertTrue(all(id(declaration) in declarations_ids for declaration in other_declarations))
+
+    def test_only_declarations_reachable_from_roots_are_parsed(self):
+        declarations = get_schema_declarations(
+            self.get_fixture_path(["xsds", "includes", "root.xsd"]),
+            roots=["{http://tempuri.org/Includes.xsd}PaymentType"]
+        )
+        self.assertEqual([declaration.name for declaration in declarations], ["Address", "PaymentType"])
+
+    def test_streaming_parse_gives_same_declarations(self):
+        for fixture in [["xsds", "includes", "root.xsd"], ["xsds", "minimal.xsd"]]:
+            location = self.get_fixture_path(fixture)
+            self.assertEqual(
+                repr(get_schema_declarations(location, stream=True)),
+                repr(get_schema_declarations(location))
+            )
+
+    def test_comments_and_nested_prefixes(self):
+        schema = lxml.etree.fromstring(
+            b"""<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema" xmlns:tns="urn:a" targetNamespace="urn:a">
+                <!-- comments are skipped -->
+                <xs:complexType name="Order">
+                    <xs:sequence>
+                        <xs:element name="id" type="xs:int"/>
+                        <xs:element xmlns:b="urn:b" name="customer" type="b:Customer"/>
+                        <xs:element xmlns:tns="urn:b" name="invoice" type="tns:Invoice"/>
+                        <xs:element name="next" type="tns:Order"/>
+                    </xs:sequence>
+                </xs:complexType>
+                <xs:element name="order" type="tns:Order"/>
+            </xs:schema>"""
+        )
+        order_type, order_element = SchemaParser(schema).get_declarations()
+
+        self.assertEqual(
+            [element.type for element in order_type.elements],
+            [f"{{{XS_NAMESPACE}}}int", "{urn:b}Customer", "{urn:b}Invoice", "{urn:a}Order"]
+        )
+        self.assertEqual(order_element.type, "{urn:a}Order")
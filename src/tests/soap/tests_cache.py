@@ -0,0 +1,62 @@
+import os
+import tempfile
+
+from helpers.utils import SoapToolsTestCase
+from soaptools.soap.cache import DeclarationCache
+from soaptools.soap.loader import DocumentLoader
+from soaptools.soap.schema_parser.parser import get_schema_declarations
+
+
+class DeclarationCacheTestCase(SoapToolsTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = DeclarationCache(os.path.join(self.directory.name, "declarations"))
+        self.schema_location = os.path.join(self.directory.name, "minimal.xsd")
+        with open(self.get_fixture_path(["xsds", "minimal.xsd"])) as fixture:
+            with open(self.schema_location, mode="w") as file:
+                file.write(fixture.read())
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_unchanged_sources_skip_parsing(self):
+        declarations = get_schema_declarations(self.schema_location, DocumentLoader(), self.cache)
+
+        loader = DocumentLoader()
+        cached_declarations = get_schema_declarations(self.schema_location, loader, self.cache)
+        self.assertEqual(
+            [declaration.identifier for declaration in cached_declarations],
+            [declaration.identifier for declaration in declarations]
+        )
+        self.assertEqual(loader.documents, {})
+        self.assertEqual(list(loader.get_sources(self.schema_location)), [self.schema_location])
+
+    def test_changed_source_invalidates_model(self):
+        get_schema_declarations(self.schema_location, DocumentLoader(), self.cache)
+        with open(self.schema_location, mode="a") as file:
+            file.write("<!-- changed -->")
+
+        loader = DocumentLoader()
+        get_schema_declarations(self.schema_location, loader, self.cache)
+        self.assertIn(self.schema_location, loader.documents)
+
+    def test_same_relative_location_in_other_directory(self):
+        directories = [os.path.join(self.directory.name, name) for name in ["a", "b"]]
+        for directory in directories:
+            os.mkdir(directory)
+            with open(os.path.join(directory, "schema.xsd"), mode="w") as file:
+                file.write(
+                    f'<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema" targetNamespace="urn:{os.path.basename(directory)}">'
+                    f'<xs:element name="Order" type="xs:string"/></xs:schema>'
+                )
+
+        working_directory = os.getcwd()
+        identifiers = []
+        try:
+            for directory in directories:
+                os.chdir(directory)
+                declarations = get_schema_declarations("schema.xsd", DocumentLoader(), self.cache)
+                identifiers.append([declaration.identifier for declaration in declarations])
+        finally:
+            os.chdir(working_directory)
+        self.assertEqual(identifiers, [["{urn:a}Order"], ["{urn:b}Order"]])
@@ -0,0 +1,145 @@
+import collections
+import http.server
+import os
+import tempfile
+import threading
+import time
+from functools import partial
+from unittest import TestCase
+
+import lxml.etree
+
+from soaptools.soap.loader import DocumentLoader
+from soaptools.soap.schema_parser.parser import SchemaParser, get_schema_declarations
+
+SCHEMA = '<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema" targetNamespace="urn:{name}">{references}</xs:schema>'
+IMPORT = '<xs:import namespace="urn:{name}" schemaLocation="{name}.xsd"/>'
+
+
+class CountingRequestHandler(http.server.SimpleHTTPRequestHandler):
+    requested_paths = collections.Counter()
+    lock = threading.Lock()
+    delay = 0.0
+    running = 0
+    max_running = 0
+
+    def do_GET(self):
+        with self.lock:
+            self.requested_paths[self.path] += 1
+            CountingRequestHandler.running += 1
+            CountingRequestHandler.max_running = max(CountingRequestHandler.max_running, CountingRequestHandler.running)
+        try:
+            time.sleep(self.delay)
+            super().do_GET()
+        finally:
+            with self.lock:
+                CountingRequestHandler.running -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+class DocumentLoaderTestCase(TestCase):
+    # document name -> imported documents names
+    graph = {
+        "root": ["a", "b"],
+        "a": ["c", "d"],
+        "b": ["c", "e"],
+        "c": [],
+        "d": [],
+        "e": ["a"],
+    }
+
+    def setUp(self):
+        self.served_directory = tempfile.TemporaryDirectory()
+        for name, imported in self.graph.items():
+            self.write_schema(name, imported)
+
+        CountingRequestHandler.requested_paths = collections.Counter()
+        CountingRequestHandler.delay = 0.0
+        CountingRequestHandler.running = 0
+        CountingRequestHandler.max_running = 0
+        handler = partial(CountingRequestHandler, directory=self.served_directory.name)
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.served_directory.cleanup()
+
+    def write_schema(self, name, imported):
+        with open(os.path.join(self.served_directory.name, f"{name}.xsd"), mode="w") as file:
+            file.write(SCHEMA.format(name=name, references="".join(IMPORT.format(name=i_name) for i_name in imported)))
+
+    def test_concurrent_prefetches_fetch_each_document_once(self):
+        CountingRequestHandler.delay = 0.05
+        loader = DocumentLoader(max_workers=2, cache=None)
+        root = loader.load(self.url + "root.xsd")
+
+        threads = [threading.Thread(target=loader.prefetch_schemas, args=([root],)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(CountingRequestHandler.requested_paths, {f"/{name}.xsd": 1 for name in self.graph})
+        self.assertEqual(len(loader.documents), len(self.graph))
+
+    def test_prefetch_requests_each_document_once_with_bounded_workers(self):
+        CountingRequestHandler.delay = 0.05
+        loader = DocumentLoader(max_workers=2, cache=None)
+
+        declarations = get_schema_declarations(self.url + "root.xsd", loader)
+
+        self.assertEqual(declarations, [])
+        self.assertEqual(CountingRequestHandler.requested_paths, {f"/{name}.xsd": 1 for name in self.graph})
+        self.assertEqual(CountingRequestHandler.max_running, 2)
+
+    def test_concurrent_digests_and_loads_fetch_document_once(self):
+        CountingRequestHandler.delay = 0.05
+        loader = DocumentLoader(cache=None)
+        digests = []
+
+        def get_digest():
+            digests.append(loader.get_digest(self.url + "c.xsd"))
+
+        threads = [threading.Thread(target=get_digest) for _ in range(4)]
+        threads.append(threading.Thread(target=loader.load, args=(self.url + "c.xsd",)))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(CountingRequestHandler.requested_paths, {"/c.xsd": 1})
+        self.assertEqual(len(digests), 4)
+        self.assertEqual(len(set(digests)), 1)
+
+    def test_missing_import_raises_from_parser(self):
+        self.write_schema("d", ["missing"])
+        loader = DocumentLoader(cache=None)
+
+        with self.assertRaises(SchemaParser.ImportSchemaException):
+            get_schema_declarations(self.url + "root.xsd", loader)
+        self.assertNotIn(self.url + "missing.xsd", loader.documents)
+
+    def test_encoding_from_xml_declaration(self):
+        content = '<?xml version="1.0" encoding="ISO-8859-2"?><schema name="Zażółć"/>'.encode("iso-8859-2")
+        with open(os.path.join(self.served_directory.name, "latin2.xsd"), mode="wb") as file:
+            file.write(content)
+        loader = DocumentLoader(cache=None)
+
+        # remote document without cache is parsed from response bytes, local one from its path
+        for location in [self.url + "latin2.xsd", os.path.join(self.served_directory.name, "latin2.xsd")]:
+            with self.subTest(location=location):
+                self.assertEqual(loader.load(location).attrib["name"], "Zażółć")
+
+    def test_huge_tree(self):
+        path = os.path.join(self.served_directory.name, "deep.xsd")
+        with open(path, mode="wb") as file:
+            file.write(b"<a>" * 300 + b"</a>" * 300)
+
+        with self.assertRaises(lxml.etree.XMLSyntaxError):
+            DocumentLoader(cache=None).load(path)
+        self.assertEqual(DocumentLoader(cache=None, huge_tree=True).load(path).tag, "a")